@@ -1,6 +1,6 @@
 import { BlockfrostProvider, MeshWallet } from "@meshsdk/core";
 import { SensorContract } from "../scripts";
-import { readDHT22 } from "../sensor";
+import { readDHT22, WindowSummary } from "../sensor";
 import * as dotenv from "dotenv";
 dotenv.config();
 
@@ -15,7 +15,33 @@ let wallet = new MeshWallet({
   },
 });
 
-export const writeDataToContract = async () => {
+// Cardano metadata strings are limited to 64 bytes
+const chunk = (hex: string): string[] => hex.match(/.{1,64}/g) || [];
+
+/**
+ * Metadata form of a window summary: integers only (×1000) and chunked series
+ */
+const toMetadata = (sensorName: string, window: WindowSummary) => ({
+  sensor: sensorName,
+  start: Math.floor(window.start),
+  end: Math.floor(window.end),
+  count: window.count,
+  temperature: [window.temperature.min, window.temperature.max, window.temperature.mean].map(v => Math.round(v * 1000)),
+  humidity: [window.humidity.min, window.humidity.max, window.humidity.mean].map(v => Math.round(v * 1000)),
+  series: {
+    scale: window.series.scale,
+    t: chunk(window.series.t),
+    temperature: chunk(window.series.temperature),
+    humidity: chunk(window.series.humidity),
+  },
+});
+
+/**
+ * Write one datum to the sensor contract.
+ * With a window summary, the datum holds the window means and the full
+ * min/max/count + delta-encoded series go into the same transaction's metadata.
+ */
+export const writeDataToContract = async (window?: WindowSummary) => {
   const timestamp = new Date().toLocaleString();
   
   console.log('\n╔══════════════════════════════════════════════════════════╗');
@@ -25,7 +51,12 @@ export const writeDataToContract = async () => {
   
   // Read sensor data
   console.log('📡 Step 1/5: Reading sensor data...');
-  const sensorData = await readDHT22();
+  const sensorData = window
+    ? { temperature: window.temperature.mean, humidity: window.humidity.mean }
+    : await readDHT22();
+  if (window) {
+    console.log(`   • Window: ${window.count} readings over ${Math.round(window.end - window.start)}s`);
+  }
   
   if (!sensorData || !sensorData.temperature || !sensorData.humidity) {
     console.error('❌ ERROR: No valid sensor data available');
@@ -53,6 +84,7 @@ export const writeDataToContract = async () => {
       sensorName: 'dht22_sensor_01',
       temperature: tempOnChain,
       humidity: humidityOnChain,
+      summary: window ? toMetadata('dht22_sensor_01', window) : undefined,
     });
     
     console.log('   ✓ Transaction built successfully\n');
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Windowed aggregation of DHT22 readings.
+Collapses many samples into one summary (min/max/mean/count) plus a compact
+delta-encoded series, so a whole window fits in a single on-chain write.
+"""
+
+import time
+
+# Sensor resolution is 0.1, so series values are stored as integer tenths
+SCALE = 10
+
+
+def _zigzag(n):
+    return (n << 1) ^ (n >> 63)
+
+
+def _unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def encode_deltas(values):
+    """Encode a list of ints as zigzag varint deltas. Returns hex string."""
+    out = bytearray()
+    prev = 0
+    for value in values:
+        n = _zigzag(value - prev)
+        prev = value
+        while n >= 0x80:
+            out.append((n & 0x7F) | 0x80)
+            n >>= 7
+        out.append(n)
+    return out.hex()
+
+
+def decode_deltas(hex_str):
+    """Decode a hex string produced by encode_deltas back to a list of ints."""
+    values = []
+    prev = 0
+    n = 0
+    shift = 0
+    for byte in bytes.fromhex(hex_str):
+        n |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        prev += _unzigzag(n)
+        values.append(prev)
+        n = 0
+        shift = 0
+    return values
+
+
+def _stats(values):
+    return {
+        "min": min(values) / SCALE,
+        "max": max(values) / SCALE,
+        "mean": round(sum(values) / len(values) / SCALE, 2),
+    }
+
+
+class WindowAggregator:
+    """Accumulates readings and emits a summary every `window_seconds`."""
+
+    def __init__(self, window_seconds=600):
+        self.window_seconds = window_seconds
+        self._reset(None)
+
+    def _reset(self, start):
+        self.start = start
+        self.times = []
+        self.temperatures = []
+        self.humidities = []
+
+    def add(self, reading, timestamp=None):
+        """
+        Add one reading ({"temperature", "humidity"}).
+
+        Returns the summary of the previous window when this reading falls
+        outside it, otherwise None. Error readings are ignored.
+        """
+        if reading.get("temperature") is None or reading.get("humidity") is None:
+            return None
+
+        timestamp = timestamp if timestamp is not None else reading.get("timestamp", time.time())
+        summary = None
+        if self.start is None:
+            self.start = timestamp
+        elif timestamp - self.start >= self.window_seconds:
+            summary = self.flush()
+            self.start = timestamp
+
+        self.times.append(int(round(timestamp - self.start)))
+        self.temperatures.append(int(round(reading["temperature"] * SCALE)))
+        self.humidities.append(int(round(reading["humidity"] * SCALE)))
+        return summary
+
+    def flush(self):
+        """Close the current window. Returns its summary, or None if empty."""
+        if not self.times:
+            self._reset(None)
+            return None
+
+        summary = {
+            "type": "window",
+            "start": round(self.start, 3),
+            "end": round(self.start + self.times[-1], 3),
+            "count": len(self.times),
+            "temperature": _stats(self.temperatures),
+            "humidity": _stats(self.humidities),
+            "series": {
+                "scale": SCALE,
+                "t": encode_deltas(self.times),
+                "temperature": encode_deltas(self.temperatures),
+                "humidity": encode_deltas(self.humidities),
+            },
+        }
+        self._reset(None)
+        return summary
+
+
+def decode_series(summary):
+    """Expand a window summary's series back into a list of readings."""
+    series = summary["series"]
+    scale = series["scale"]
+    return [
+        {
+            "timestamp": summary["start"] + t,
+            "temperature": temperature / scale,
+            "humidity": humidity / scale,
+        }
+        for t, temperature, humidity in zip(
+            decode_deltas(series["t"]),
+            decode_deltas(series["temperature"]),
+            decode_deltas(series["humidity"]),
+        )
+    ]
@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
+import os
 import sys
 import json
 import time
+import select
+import socket
+import argparse
 import board
+from aggregator import WindowAggregator
+from ring_buffer import RingBuffer
+from read_scheduler import ReadScheduler, MIN_INTERVAL
 
 try:
     import adafruit_dht
@@ -10,40 +17,175 @@ except ImportError:
     print(json.dumps({"error": "adafruit-circuitpython-dht library not installed"}))
     sys.exit(1)
 
-def read_dht22():
+
+def open_sensor():
     board_pin = board.D4
-    
+    return adafruit_dht.DHT22(board_pin, use_pulseio=False)
+
+
+def read_once(dht_device):
+    """Single read attempt. Raises RuntimeError on a transient sensor failure."""
+    temperature = dht_device.temperature
+    humidity = dht_device.humidity
+    if humidity is None or temperature is None:
+        raise RuntimeError("Sensor returned no data")
+    return {
+        "temperature": round(temperature, 1),
+        "humidity": round(humidity, 1)
+    }
+
+
+def read_sample(scheduler, attempts=5, deadline=None):
+    """Read with retries timed to the sensor cadence. Returns a result dict or an error dict."""
+    try:
+        return scheduler.read(max_attempts=attempts, deadline=deadline)
+    except Exception as e:
+        return {"error": f"Unexpected error: {str(e)}"}
+
+
+def read_dht22():
     try:
-        dht_device = adafruit_dht.DHT22(board_pin, use_pulseio=False)
+        dht_device = open_sensor()
     except Exception as e:
         print(json.dumps({"error": f"Failed to initialize sensor: {str(e)}"}))
         sys.exit(1)
-    
-    for attempt in range(5):
-        try:
-            temperature = dht_device.temperature
-            humidity = dht_device.humidity
-            
-            if humidity is not None and temperature is not None:
-                result = {
-                    "temperature": round(temperature, 1),
-                    "humidity": round(humidity, 1)
-                }
-                dht_device.exit()
-                print(json.dumps(result))
-                return
-        except RuntimeError as e:
-            if attempt < 4:
-                time.sleep(2)
-            continue
-        except Exception as e:
-            print(json.dumps({"error": f"Unexpected error: {str(e)}"}))
-            dht_device.exit()
-            sys.exit(1)
-    
+
+    result = read_sample(ReadScheduler(lambda: read_once(dht_device)))
     dht_device.exit()
-    print(json.dumps({"error": "Failed to read sensor data after 5 attempts"}))
-    sys.exit(1)
+    print(json.dumps(result))
+    if "error" in result:
+        sys.exit(1)
+
+
+class LineBroadcaster:
+    """Writes newline-delimited JSON to stdout or to every client of a Unix socket."""
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path
+        self.server = None
+        self.clients = []
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.server.bind(socket_path)
+            self.server.listen(8)
+            self.server.setblocking(False)
+
+    def wait(self, seconds):
+        """Sleep until the next sample is due, accepting socket clients meanwhile."""
+        deadline = time.monotonic() + seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if not self.server:
+                time.sleep(remaining)
+                return
+            readable, _, _ = select.select([self.server], [], [], remaining)
+            if readable:
+                client, _ = self.server.accept()
+                client.setblocking(False)
+                self.clients.append(client)
+
+    def send(self, data):
+        line = json.dumps(data) + "\n"
+        if not self.server:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+            return
+
+        payload = line.encode("utf-8")
+        for client in list(self.clients):
+            try:
+                client.sendall(payload)
+            except OSError:
+                client.close()
+                self.clients.remove(client)
+
+    def close(self):
+        for client in self.clients:
+            client.close()
+        if self.server:
+            self.server.close()
+            os.unlink(self.socket_path)
+
+
+def stream_dht22(interval=MIN_INTERVAL, socket_path=None, window=None, store_path=None, stats_every=None):
+    """
+    Keep the sensor open and emit one JSON reading per line every `interval` seconds.
+    With `window`, also emit a {"type": "window"} summary every `window` seconds.
+    With `store_path`, also append every good reading to a ring buffer file.
+    With `stats_every`, emit a {"type": "stats"} line (failure rate, latency percentiles) every N seconds.
+
+    If every retry within an interval fails, the last good reading is sent
+    again with "stale": true and its "age" in seconds.
+    """
+    interval = max(interval, MIN_INTERVAL)
+    aggregator = WindowAggregator(window) if window else None
+    store = RingBuffer(store_path) if store_path else None
+    try:
+        dht_device = open_sensor()
+    except Exception as e:
+        print(json.dumps({"error": f"Failed to initialize sensor: {str(e)}"}))
+        sys.exit(1)
+
+    scheduler = ReadScheduler(lambda: read_once(dht_device))
+    out = LineBroadcaster(socket_path)
+    last_stats = time.monotonic()
+    try:
+        while True:
+            started = time.monotonic()
+            # Retry only while the next attempt still starts within this interval
+            result = read_sample(scheduler, attempts=5, deadline=started + interval)
+            if "error" in result:
+                last = scheduler.latest()
+                if last:
+                    result = dict(last, stale=True, error=result["error"])
+            else:
+                result["timestamp"] = round(time.time(), 3)
+                if store:
+                    store.append(result["temperature"], result["humidity"], timestamp=result["timestamp"])
+                if aggregator:
+                    summary = aggregator.add(result, timestamp=result["timestamp"])
+                    if summary:
+                        out.send(summary)
+            out.send(result)
+
+            if stats_every and time.monotonic() - last_stats >= stats_every:
+                out.send(dict(scheduler.stats(), type="stats"))
+                last_stats = time.monotonic()
+            out.wait(interval - (time.monotonic() - started))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        summary = aggregator.flush() if aggregator else None
+        if summary:
+            out.send(summary)
+        out.close()
+        if store:
+            store.flush()
+            store.close()
+        dht_device.exit()
+
 
 if __name__ == "__main__":
-    read_dht22()
+    parser = argparse.ArgumentParser(description="Read DHT22 temperature/humidity")
+    parser.add_argument("--stream", action="store_true", help="Keep sensor open and stream NDJSON readings")
+    parser.add_argument("--interval", type=float, default=MIN_INTERVAL, help="Seconds between streamed readings")
+    parser.add_argument("--socket", help="Serve the stream on this Unix socket instead of stdout")
+    parser.add_argument("--window", type=float, help="Also emit min/max/mean summaries every N seconds")
+    parser.add_argument("--store", help="Also persist readings to this ring buffer file")
+    parser.add_argument("--stats", type=float, help="Emit read failure rate and latency percentiles every N seconds")
+    args = parser.parse_args()
+
+    if args.stream:
+        stream_dht22(
+            interval=args.interval,
+            socket_path=args.socket,
+            window=args.window,
+            store_path=args.store,
+            stats_every=args.stats,
+        )
+    else:
+        read_dht22()
@@ -1,5 +1,5 @@
 #!/usr/bin/env node
-import { readDHT22 } from "./sensor";
+import { readDHT22, startDHT22Stream } from "./sensor";
 import { writeDataToContract } from "./action/write";
 import { readDataFromContract } from "./action/read";
 
@@ -12,6 +12,9 @@ const flags = {
   help: args.includes('--help') || args.includes('-h'),
 };
 
+// Aggregation window for --write (default 20 minutes)
+const WINDOW_SECONDS = Number(process.env.DHT22_WINDOW_SECONDS || 20 * 60);
+
 
 /**
  * Display help information
@@ -27,7 +30,7 @@ Usage: npm start [options]
 Options:
   (no flags)        Monitor sensor data only (default mode)
   --once            Read sensor once and exit
-  --write           Monitor sensor + write to blockchain every 2 min
+  --write           Monitor sensor + write aggregated window to blockchain every 20 min
   --monitor         Real-time monitoring from blockchain
   --help, -h        Show this help message
 
@@ -55,17 +58,17 @@ async function monitorSensor() {
   console.log('  Out      -> GPIO 4 (Pin 7)');
   console.log('  Negative -> GND (Pin 9)');
   console.log('========================================');
-  console.log(`Read Interval: 0,5 seconds`);
+  console.log(`Read Interval: 2 seconds (streamed)`);
   console.log('Press Ctrl+C to stop');
   console.log('========================================\n');
 
-  // Read immediately
-  console.log(await readDHT22());
+  // Keep one dht22.py process open instead of spawning one per reading
+  startDHT22Stream({ intervalSeconds: 2, socketPath: process.env.DHT22_SOCKET });
 
-  // Then read at intervals
   setInterval(async () => {
-    console.log(await readDHT22());;
-  }, 500);
+    const data = await readDHT22();
+    if (data) console.log(data);
+  }, 2000);
 }
 
 /**
@@ -80,13 +83,19 @@ async function write() {
   console.log('  Out      -> GPIO 4 (Pin 7)');
   console.log('  Negative -> GND (Pin 9)');
   console.log('========================================');
-  console.log(`Blockchain Write: Every 2 minutes`);
+  console.log(`Blockchain Write: Every ${WINDOW_SECONDS / 60} minutes (aggregated)`);
   console.log('Press Ctrl+C to stop');
   console.log('========================================\n');
 
-  writeDataToContract();
-  const intervalMs = 2 * 60 * 1000; // 2 minutes
-  setInterval(writeDataToContract, intervalMs);
+  // One transaction per window: datum carries the means, metadata the full series
+  startDHT22Stream({
+    intervalSeconds: 2,
+    socketPath: process.env.DHT22_SOCKET,
+    windowSeconds: WINDOW_SECONDS,
+    onWindow: summary => {
+      writeDataToContract(summary).catch(() => { /* logged in writeDataToContract */ });
+    },
+  });
 
 }
 
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Read scheduling for the DHT22.
+The sensor needs ~2 s between reads, so instead of sleeping a fixed 2 s after
+each failure, retries fire exactly when the next read becomes possible.
+The last good value is kept (with its age) for when every retry fails, and
+failure rate and read latency percentiles are tracked.
+"""
+
+import time
+import threading
+from collections import deque
+
+MIN_INTERVAL = 2.0
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ReadScheduler:
+    """
+    Wraps a single-attempt read function.
+
+    `read_fn` returns a dict with "temperature" and "humidity", and raises
+    RuntimeError for a transient sensor failure.
+    """
+
+    def __init__(self, read_fn, min_interval=MIN_INTERVAL, history=256):
+        self.read_fn = read_fn
+        self.min_interval = min_interval
+        self.last_attempt = None
+        self.last_good = None
+        self.last_good_time = None
+        self.attempts = 0
+        self.failures = 0
+        self.latencies = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def next_read_at(self):
+        """Monotonic time at which the sensor can be read again."""
+        if self.last_attempt is None:
+            return time.monotonic()
+        return self.last_attempt + self.min_interval
+
+    def _attempt(self):
+        delay = self.next_read_at() - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        started = time.monotonic()
+        self.last_attempt = started
+        try:
+            result = self.read_fn()
+        finally:
+            with self._lock:
+                self.attempts += 1
+                self.latencies.append(time.monotonic() - started)
+
+        with self._lock:
+            self.last_good = dict(result)
+            self.last_good_time = time.time()
+        return result
+
+    def read(self, max_attempts=5, deadline=None):
+        """
+        Read with retries, each one scheduled at the earliest possible moment.
+        `deadline` (monotonic) stops retrying once the next read would start after it.
+        Returns the reading, or an error dict after the last failed attempt.
+        """
+        error = None
+        tried = 0
+        while tried < max_attempts:
+            if tried and deadline is not None and self.next_read_at() > deadline:
+                break
+            tried += 1
+            try:
+                return self._attempt()
+            except RuntimeError as e:
+                with self._lock:
+                    self.failures += 1
+                error = str(e)
+        return {"error": f"Failed to read sensor data after {tried} attempts: {error}"}
+
+    def latest(self):
+        """Last good reading with its age in seconds (None before the first success)."""
+        with self._lock:
+            if self.last_good is None:
+                return None
+            reading = dict(self.last_good)
+            reading["timestamp"] = round(self.last_good_time, 3)
+            reading["age"] = round(time.time() - self.last_good_time, 3)
+            return reading
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            attempts = self.attempts
+            failures = self.failures
+
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "attempts": attempts,
+            "failures": failures,
+            "failure_rate": round(failures / attempts, 4) if attempts else 0.0,
+            "latency_ms": {
+                "p50": ms(_percentile(latencies, 50)),
+                "p95": ms(_percentile(latencies, 95)),
+                "p99": ms(_percentile(latencies, 99)),
+            },
+        }
+
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Fixed-size ring buffer of DHT22 readings, memory-mapped to a file.
+Each sample takes 8 bytes (uint32 timestamp, int16 temperature and
+uint16 humidity in tenths), survives restarts, and range queries return
+memoryview slices of the mapping instead of copies.
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+
+MAGIC = b"DHT1"
+VERSION = 1
+# magic, version, record size, capacity, total records ever written
+HEADER = struct.Struct("<4sHHIQ")
+HEADER_SIZE = 32
+RECORD = struct.Struct("<IhH")
+SCALE = 10
+
+DEFAULT_PATH = "sensor_readings.bin"
+# One week of readings at the 2 s DHT22 cadence (~2.4 MB)
+DEFAULT_CAPACITY = 7 * 24 * 3600 // 2
+
+
+class RingBuffer:
+    """Append-only ring of timestamped readings backed by an mmap'd file."""
+
+    def __init__(self, path=DEFAULT_PATH, capacity=DEFAULT_CAPACITY):
+        size = HEADER_SIZE + capacity * RECORD.size
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE
+        self.file = open(path, "r+b" if exists else "w+b")
+        if not exists:
+            self.file.truncate(size)
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, capacity, 0))
+            self.file.flush()
+
+        self.mm = mmap.mmap(self.file.fileno(), 0)
+        magic, version, record_size, stored_capacity, _ = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a DHT22 ring buffer")
+        # An existing file keeps the capacity it was created with
+        self.capacity = stored_capacity
+
+    @property
+    def count(self):
+        """Total readings ever appended (including overwritten ones)."""
+        return HEADER.unpack_from(self.mm, 0)[4]
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _first(self):
+        count = self.count
+        return count % self.capacity if count >= self.capacity else 0
+
+    def _offset(self, index):
+        """File offset of the index-th oldest stored reading."""
+        return HEADER_SIZE + ((self._first() + index) % self.capacity) * RECORD.size
+
+    def _timestamp(self, index):
+        return struct.unpack_from("<I", self.mm, self._offset(index))[0]
+
+    def append(self, temperature, humidity, timestamp=None):
+        timestamp = int(timestamp if timestamp is not None else time.time())
+        count = self.count
+        offset = HEADER_SIZE + (count % self.capacity) * RECORD.size
+        RECORD.pack_into(
+            self.mm, offset,
+            timestamp,
+            int(round(temperature * SCALE)),
+            int(round(humidity * SCALE)),
+        )
+        # Publish the record only after it is fully written
+        struct.pack_into("<Q", self.mm, 12, count + 1)
+
+    def _bisect(self, timestamp):
+        """Index of the first stored reading with ts >= timestamp."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamp(mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def range(self, start=0, end=None):
+        """
+        Readings with start <= ts < end as memoryview slices of the mapping.
+        Returns at most two slices (the range may wrap around the end of the ring).
+        """
+        lo = self._bisect(start)
+        hi = len(self) if end is None else self._bisect(end)
+        if lo >= hi:
+            return []
+
+        view = memoryview(self.mm)
+        first = self._offset(lo)
+        n = hi - lo
+        until_wrap = (HEADER_SIZE + self.capacity * RECORD.size - first) // RECORD.size
+        if n <= until_wrap:
+            return [view[first:first + n * RECORD.size]]
+        return [
+            view[first:first + until_wrap * RECORD.size],
+            view[HEADER_SIZE:HEADER_SIZE + (n - until_wrap) * RECORD.size],
+        ]
+
+    def iter_range(self, start=0, end=None):
+        """Decode readings in [start, end) as dicts."""
+        for segment in self.range(start, end):
+            for timestamp, temperature, humidity in RECORD.iter_unpack(segment):
+                yield {
+                    "timestamp": timestamp,
+                    "temperature": temperature / SCALE,
+                    "humidity": humidity / SCALE,
+                }
+
+    def latest(self):
+        if not len(self):
+            return None
+        timestamp, temperature, humidity = RECORD.unpack_from(self.mm, self._offset(len(self) - 1))
+        return {"timestamp": timestamp, "temperature": temperature / SCALE, "humidity": humidity / SCALE}
+
+    def flush(self):
+        self.mm.flush()
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dump stored DHT22 readings as NDJSON")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH, help="Ring buffer file")
+    parser.add_argument("--since", type=float, default=3600, help="Seconds of history to dump")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(json.dumps({"error": f"{args.path} not found"}))
+        sys.exit(1)
+
+    store = RingBuffer(args.path)
+    for reading in store.iter_range(start=time.time() - args.since):
+        print(json.dumps(reading))
+    store.close()
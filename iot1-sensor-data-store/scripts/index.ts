@@ -9,6 +9,11 @@ import {
 } from '@meshsdk/core';
 import { MeshAdapter } from './mesh';
 
+/**
+ * Transaction metadata label carrying aggregated window summaries
+ */
+export const SENSOR_SUMMARY_LABEL = 1337;
+
 /**
  * SensorContract
  *
@@ -37,16 +42,19 @@ export class SensorContract extends MeshAdapter {
      * @param {string} params.sensor           - The sensor’s unique identifier (token name).
      * @param {number} params.temperature       - The current temperature reading.
      * @param {number} params.humidity         - The current humidity reading.
+     * @param {object} [params.summary]        - Optional window summary attached as transaction metadata.
      * @returns {Promise<any>}                 - The completed unsigned transaction ready for signing.
      */
     public write = async ({
         sensorName,
         temperature,
         humidity,
+        summary,
     }: {
         sensorName: string;
         temperature: number;
         humidity: number;
+        summary?: object;
     }) => {
         const { utxos, collateral, walletAddress } =
             await this.getWalletForTx();
@@ -91,6 +99,10 @@ export class SensorContract extends MeshAdapter {
                 );
         }
 
+        if (summary) {
+            unsignedTx.metadataValue(SENSOR_SUMMARY_LABEL, summary);
+        }
+
         unsignedTx
             .changeAddress(walletAddress)
             .requiredSignerHash(deserializeAddress(walletAddress).pubKeyHash)
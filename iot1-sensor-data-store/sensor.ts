@@ -1,4 +1,6 @@
 import { PythonShell } from 'python-shell';
+import net from 'net';
+import readline from 'readline';
 import path from 'path';
 import { fileURLToPath } from 'url';
 
@@ -9,13 +11,257 @@ const __dirname = path.dirname(__filename);
 interface SensorData {
   temperature?: number;
   humidity?: number;
+  timestamp?: number;
   error?: string;
 }
 
+export interface WindowStats {
+  min: number;
+  max: number;
+  mean: number;
+}
+
+/**
+ * Window summary emitted by `dht22.py --stream --window N` (see aggregator.py)
+ */
+export interface WindowSummary {
+  type: 'window';
+  start: number;
+  end: number;
+  count: number;
+  temperature: WindowStats;
+  humidity: WindowStats;
+  series: {
+    scale: number;
+    t: string;
+    temperature: string;
+    humidity: string;
+  };
+}
+
+interface StreamOptions {
+  intervalSeconds?: number;
+  socketPath?: string;
+  windowSeconds?: number;
+  onWindow?: (summary: WindowSummary) => void;
+}
+
+// Series values are integer tenths, as in aggregator.py
+const SERIES_SCALE = 10;
+
+/**
+ * Zigzag varint deltas as hex (same encoding as aggregator.encode_deltas)
+ */
+function encodeDeltas(values: number[]): string {
+  const out: number[] = [];
+  let prev = 0;
+  for (const value of values) {
+    const delta = value - prev;
+    let n = delta >= 0 ? delta * 2 : -delta * 2 - 1;
+    prev = value;
+    while (n >= 0x80) {
+      out.push((n % 0x80) | 0x80);
+      n = Math.floor(n / 0x80);
+    }
+    out.push(n);
+  }
+  return Buffer.from(out).toString('hex');
+}
+
+function windowStats(values: number[]): WindowStats {
+  return {
+    min: Math.min(...values) / SERIES_SCALE,
+    max: Math.max(...values) / SERIES_SCALE,
+    mean: Math.round((values.reduce((a, b) => a + b, 0) / values.length / SERIES_SCALE) * 100) / 100,
+  };
+}
+
+/**
+ * TypeScript side of aggregator.WindowAggregator, used when attached to a
+ * daemon socket: the daemon's own --window (if any) need not match ours.
+ */
+class WindowAggregator {
+  private start: number | null = null;
+  private times: number[] = [];
+  private temperatures: number[] = [];
+  private humidities: number[] = [];
+
+  constructor(private windowSeconds: number) {}
+
+  /**
+   * Add one reading (timestamp in seconds); returns the previous window's
+   * summary when this reading falls outside it
+   */
+  add(temperature: number, humidity: number, timestamp: number): WindowSummary | null {
+    let summary: WindowSummary | null = null;
+    if (this.start === null) {
+      this.start = timestamp;
+    } else if (timestamp - this.start >= this.windowSeconds) {
+      summary = this.flush();
+      this.start = timestamp;
+    }
+    this.times.push(Math.round(timestamp - this.start));
+    this.temperatures.push(Math.round(temperature * SERIES_SCALE));
+    this.humidities.push(Math.round(humidity * SERIES_SCALE));
+    return summary;
+  }
+
+  flush(): WindowSummary | null {
+    const start = this.start;
+    const summary: WindowSummary | null = start === null || this.times.length === 0 ? null : {
+      type: 'window',
+      start: Math.round(start * 1000) / 1000,
+      end: Math.round((start + this.times[this.times.length - 1]) * 1000) / 1000,
+      count: this.times.length,
+      temperature: windowStats(this.temperatures),
+      humidity: windowStats(this.humidities),
+      series: {
+        scale: SERIES_SCALE,
+        t: encodeDeltas(this.times),
+        temperature: encodeDeltas(this.temperatures),
+        humidity: encodeDeltas(this.humidities),
+      },
+    };
+    this.start = null;
+    this.times = [];
+    this.temperatures = [];
+    this.humidities = [];
+    return summary;
+  }
+}
+
 // Cache for last successful reading
 let lastValidData: SensorData | null = null;
 let lastReadTime: number = 0;
 
+// Long-running dht22.py stream (if attached)
+let streamShell: PythonShell | null = null;
+let streamSocket: net.Socket | null = null;
+// Pending reconnect to the daemon's socket after it closed
+let reconnectTimer: NodeJS.Timeout | null = null;
+const RECONNECT_MIN_MS = 1000;
+const RECONNECT_MAX_MS = 30000;
+let reconnectDelay = RECONNECT_MIN_MS;
+let onWindow: ((summary: WindowSummary) => void) | undefined;
+// Local aggregation of socket readings (null: windows come from our own dht22.py)
+let aggregator: WindowAggregator | null = null;
+
+function handleStreamLine(line: string): void {
+  if (!line.trim()) return;
+  try {
+    const data = JSON.parse(line);
+    if (data.type === 'window') {
+      if (!aggregator) onWindow?.(data as WindowSummary);
+      return;
+    }
+    if (data.temperature !== undefined && data.humidity !== undefined) {
+      lastValidData = { temperature: data.temperature, humidity: data.humidity };
+      lastReadTime = data.timestamp ? data.timestamp * 1000 : Date.now();
+      // Stale repeats of the last good reading are not new samples
+      if (aggregator && !data.stale) {
+        const summary = aggregator.add(data.temperature, data.humidity, lastReadTime / 1000);
+        if (summary) onWindow?.(summary);
+      }
+    }
+  } catch {
+    // Ignore partial or non-JSON lines
+  }
+}
+
+function connectStreamSocket(socketPath: string): void {
+  const socket = net.createConnection(socketPath);
+  readline.createInterface({ input: socket })
+    .on('line', handleStreamLine)
+    // readline re-emits socket errors, which the socket handler below already logs
+    .on('error', () => {});
+  socket.on('connect', () => { reconnectDelay = RECONNECT_MIN_MS; });
+  socket.on('error', err => console.error('DHT22 stream error:', err.message));
+  socket.on('close', () => {
+    // Closed by stopDHT22Stream
+    if (streamSocket !== socket) return;
+    streamSocket = null;
+    console.error(`DHT22 stream closed, reconnecting in ${reconnectDelay / 1000}s`);
+    reconnectTimer = setTimeout(() => {
+      reconnectTimer = null;
+      connectStreamSocket(socketPath);
+    }, reconnectDelay);
+    reconnectDelay = Math.min(reconnectDelay * 2, RECONNECT_MAX_MS);
+  });
+  streamSocket = socket;
+}
+
+/**
+ * Attach to a long-running dht22.py stream.
+ * - With socketPath: connect to a daemon started with `dht22.py --stream --socket <path>`
+ * - Otherwise: spawn `dht22.py --stream` and read NDJSON from its stdout
+ *
+ * While attached, readDHT22() serves the latest streamed reading instead of
+ * spawning a Python process per call. With windowSeconds, onWindow receives
+ * one aggregated summary per window; on a socket the readings are aggregated
+ * here, since the daemon's --window is not ours to choose. A closed socket
+ * is reconnected with exponential backoff (1 s up to 30 s).
+ */
+export function startDHT22Stream(options: StreamOptions = {}): void {
+  if (isStreaming()) return;
+  onWindow = options.onWindow;
+  aggregator = null;
+
+  if (options.socketPath) {
+    if (options.windowSeconds) {
+      aggregator = new WindowAggregator(options.windowSeconds);
+    }
+    reconnectDelay = RECONNECT_MIN_MS;
+    connectStreamSocket(options.socketPath);
+    return;
+  }
+
+  const args = ['--stream', '--interval', String(options.intervalSeconds ?? 2)];
+  if (options.windowSeconds) {
+    args.push('--window', String(options.windowSeconds));
+  }
+
+  const shell = new PythonShell('dht22.py', {
+    mode: 'text' as const,
+    pythonPath: 'python3',
+    pythonOptions: ['-u'],
+    scriptPath: __dirname,
+    args,
+  });
+  shell.on('message', handleStreamLine);
+  shell.on('error', err => console.error('DHT22 stream error:', err.message));
+  shell.on('close', () => { streamShell = null; });
+  streamShell = shell;
+}
+
+/**
+ * Detach from the dht22.py stream
+ */
+export function stopDHT22Stream(): void {
+  if (streamShell) {
+    streamShell.kill();
+    streamShell = null;
+  }
+  if (streamSocket) {
+    const socket = streamSocket;
+    streamSocket = null;
+    socket.destroy();
+  }
+  if (reconnectTimer) {
+    clearTimeout(reconnectTimer);
+    reconnectTimer = null;
+  }
+  const summary = aggregator?.flush();
+  aggregator = null;
+  if (summary) onWindow?.(summary);
+}
+
+/**
+ * Whether readings are coming from a live stream (including while reconnecting)
+ */
+export function isStreaming(): boolean {
+  return streamShell !== null || streamSocket !== null || reconnectTimer !== null;
+}
+
 /**
  * Read sensor once (Promise-based)
  */
@@ -56,9 +302,16 @@ function dht22(): Promise<SensorData> {
  * - Out -> GPIO 4 (Pin 7)
  * - Negative -> GND (Pin 9)
  * 
- * Returns cached data if new reading fails
+ * Returns cached data if new reading fails.
+ * When a stream is attached, returns the latest streamed reading (undefined
+ * until the first good sample) and never spawns a one-shot read, which would
+ * compete with the stream for the GPIO pin.
  */
 export async function readDHT22(): Promise<SensorData | void> {
+  if (isStreaming()) {
+    return lastValidData ?? undefined;
+  }
+
   try {
     const data = await dht22();
     if (data.error) {
@@ -0,0 +1,64 @@
+"""
+Response helpers for the analytics endpoints.
+Rows come from EventLog's rollup generators; CSV and NDJSON are streamed
+in chunks so large ranges never sit in memory, JSON is returned whole.
+"""
+
+import csv
+import io
+import json
+import asyncio
+from datetime import datetime
+from typing import Iterable, Optional
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+FORMATS = ("json", "csv", "ndjson")
+CHUNK_ROWS = 500
+
+
+def timestamp(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value else None
+
+
+def _csv_chunks(rows: Iterable[dict]):
+    buffer = io.StringIO()
+    writer = None
+    for i, row in enumerate(rows, 1):
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow(row)
+        if i % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows: Iterable[dict]):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row))
+        if len(lines) == CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def respond(rows: Iterable[dict], fmt: str, name: str):
+    """JSON body, or a streamed CSV/NDJSON download (iterated in the threadpool)."""
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    if fmt == "json":
+        data = await asyncio.to_thread(list, rows)
+        return {"count": len(data), "rows": data}
+    if fmt == "csv":
+        return StreamingResponse(
+            _csv_chunks(rows),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{name}.csv"'},
+        )
+    return StreamingResponse(_ndjson_chunks(rows), media_type="application/x-ndjson")
@@ -0,0 +1,129 @@
+"""
+Batch verification of (policy, asset, student) triples for back-office rosters.
+Duplicate triples are verified once. Revoked assets and assets already in the
+asset cache are answered immediately; the rest fan out to Blockfrost at BULK
+priority with bounded concurrency, one lookup per asset. Results stream back
+as NDJSON lines in completion order, followed by a summary line.
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import List
+from pydantic import BaseModel
+import sys
+import os
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.nfc_scanner import verify_on_blockchain
+from backend.blockfrost_scheduler import BULK
+from backend.cardano import asset_cache, is_revoked
+from backend.config import ASSET_CACHE_SECONDS
+
+# Seconds a bulk lookup may wait for a scheduler slot before failing
+BULK_MAX_WAIT = 60.0
+
+
+class BatchItem(BaseModel):
+    policy_id: str
+    asset_name_hex: str
+    student_id: str
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+
+
+def group_items(items: List[BatchItem]) -> dict:
+    """Unique (policy_id, asset_name_hex, student_id) -> positions in the request."""
+    keys = {}
+    for index, item in enumerate(items):
+        key = (item.policy_id, item.asset_name_hex, str(item.student_id))
+        keys.setdefault(key, []).append(index)
+    return keys
+
+
+def _verify(key):
+    return verify_on_blockchain(*key, priority=BULK, max_age=ASSET_CACHE_SECONDS, max_wait=BULK_MAX_WAIT)
+
+
+def _verify_asset(keys):
+    # The first call fetches the asset, the rest of the group reads it from the cache
+    return [(key, _verify(key)) for key in keys]
+
+
+def _answer_locally(keys):
+    """
+    Verify triples whose asset is revoked or freshly cached.
+    Returns ([(key, source, result)], {asset_id: [key]} still needing Blockfrost).
+    """
+    answered, by_asset = [], {}
+    for key in keys:
+        policy_id, asset_name_hex, _ = key
+        if is_revoked(policy_id, asset_name_hex):
+            source = "revocation_list"
+        elif asset_cache.fresh(policy_id + asset_name_hex, ASSET_CACHE_SECONDS):
+            source = "cache"
+        else:
+            by_asset.setdefault(policy_id + asset_name_hex, []).append(key)
+            continue
+        answered.append((key, source, _verify(key)))
+    return answered, by_asset
+
+
+def _line(key, indexes, result, source):
+    line = {"indexes": indexes, "policy_id": key[0], "asset_name_hex": key[1], "source": source}
+    line.update(result)
+    return json.dumps(line) + "\n"
+
+
+async def verify_batch(items: List[BatchItem], concurrency: int):
+    """Async generator of NDJSON lines: one per unique triple, then a summary."""
+    started = time.perf_counter()
+    keys = group_items(items)
+    counts = Counter()
+
+    def tally(result, source):
+        counts["verified" if result.get("verified") else "failed"] += 1
+        counts[source] += 1
+
+    # Answer what needs no network first (off the loop: an entry can expire
+    # between fresh() and the lookup, and the cache may be on disk)
+    answered, by_asset = await asyncio.to_thread(_answer_locally, keys)
+    for key, source, result in answered:
+        tally(result, source)
+        yield _line(key, keys[key], result, source)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def lookup(group):
+        async with semaphore:
+            return await asyncio.to_thread(_verify_asset, group)
+
+    tasks = [asyncio.create_task(lookup(group)) for group in by_asset.values()]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            for key, result in await completed:
+                tally(result, "blockfrost")
+                yield _line(key, keys[key], result, "blockfrost")
+    finally:
+        # Client went away: drop lookups still waiting for a slot
+        for task in tasks:
+            task.cancel()
+
+    yield json.dumps({
+        "summary": {
+            "items": len(items),
+            "unique": len(keys),
+            "verified": counts["verified"],
+            "failed": counts["failed"],
+            "revocation_list": counts["revocation_list"],
+            "cache": counts["cache"],
+            "blockfrost": counts["blockfrost"],
+            "blockfrost_lookups": len(by_asset),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+    }) + "\n"
@@ -0,0 +1,93 @@
+"""
+Background health monitor.
+Probes Blockfrost and the NFC reader on an interval and caches the result,
+so /api/health answers from a snapshot instead of blocking on the network.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+import sys
+import os
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.cardano import check_connection
+from backend.config import HEALTH_CHECK_SECONDS
+
+# A reader that doesn't answer a firmware version query within this is reported down
+READER_PROBE_SECONDS = 2.0
+
+
+class HealthMonitor:
+    """Periodic service probes with a cached status snapshot."""
+
+    def __init__(self, interval: float = HEALTH_CHECK_SECONDS):
+        self.interval = interval
+        self.services = {"nfc_reader": "unknown", "blockchain": "unknown"}
+        # Startup state per component: pending, ready or failed
+        self.startup = {"nfc_reader": "pending", "blockchain": "pending"}
+        self.checked_at = None
+        self._checked_monotonic = None
+        # Set on follower workers: the reader is reachable through the owner's event relay
+        self.reader_relay = None
+
+    async def _probe_reader(self, scanner) -> bool:
+        """Query the reader's firmware version, under the reader lock and with a timeout."""
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(scanner.probe_reader), READER_PROBE_SECONDS)
+        except asyncio.TimeoutError:
+            # A hung reader leaves its thread blocked; the next probe tries again
+            return False
+
+    async def probe(self, scanner):
+        """Run all probes once; the Blockfrost and reader calls run off the event loop."""
+        blockchain_ok = await asyncio.to_thread(check_connection)
+        if self.reader_relay is not None:
+            reader_ok = self.reader_relay.connected
+        else:
+            reader_ok = await self._probe_reader(scanner)
+        self.services = {
+            "nfc_reader": "connected" if reader_ok else "disconnected",
+            "blockchain": "connected" if blockchain_ok else "disconnected",
+        }
+        self.checked_at = datetime.now().isoformat()
+        self._checked_monotonic = time.monotonic()
+
+    async def run(self, scanner):
+        """Background task: probe every `interval` seconds."""
+        while True:
+            try:
+                await self.probe(scanner)
+            except Exception as e:
+                print(f"Health probe failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    @property
+    def ready(self) -> bool:
+        """Every component has finished starting (successfully or not)."""
+        return all(state != "pending" for state in self.startup.values())
+
+    def status(self) -> dict:
+        """Cached status with its age; stale once two probe intervals are missed."""
+        if self._checked_monotonic is None:
+            return {"status": "starting", "ready": self.ready, "startup": dict(self.startup),
+                    "checked_at": None, "age_seconds": None, "stale": True,
+                    "services": dict(self.services)}
+
+        age = time.monotonic() - self._checked_monotonic
+        healthy = all(state == "connected" for state in self.services.values())
+        return {
+            "status": "ok" if healthy else "degraded",
+            "ready": self.ready,
+            "startup": dict(self.startup),
+            "checked_at": self.checked_at,
+            "age_seconds": round(age, 3),
+            "stale": age > 2 * self.interval + 1,
+            "services": dict(self.services),
+        }
+
+
+# Singleton instance
+monitor = HealthMonitor()
@@ -5,6 +5,7 @@ Run with: uvicorn api.main:app --host 0.0.0.0 --port 5000
 
 import asyncio
 from contextlib import asynccontextmanager
+from datetime import datetime
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import sys
@@ -13,41 +14,131 @@ import os
 # Add backend directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.config import validate_config
-from backend.cardano import check_connection
+from backend.config import validate_config, REVOCATION_REFRESH_SECONDS, SCAN_LOG_PATH, KIOSK_GATE, OFFLINE_VERIFY
+from backend.event_log import EventLog
+from backend.cardano import check_connection, load_policy_key, refresh_revocations
+from backend.api.metrics import event_loop_lag_monitor
+from backend.api.health import monitor
+from backend.api import worker_ipc
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Startup and shutdown events for the FastAPI app."""
-    # Startup
-    print("Starting NFC Verification Kiosk API...")
+async def revocation_sync_loop():
+    """Periodically pull burned student NFTs into the local revocation list."""
+    _, _, _, policy_id = await asyncio.to_thread(load_policy_key)
+    while True:
+        try:
+            count = await asyncio.to_thread(refresh_revocations, policy_id.payload.hex())
+            print(f"Revocation list refreshed: {count} revoked")
+        except Exception as e:
+            print(f"Revocation refresh failed: {e}")
+        await asyncio.sleep(REVOCATION_REFRESH_SECONDS)
+
+
+async def report_startup(component: str, state: str, detail: str = ""):
+    """Record a component's startup state and announce it to WebSocket clients."""
+    from backend.api.websocket_manager import manager
+
+    monitor.startup[component] = state
+    event = {
+        "event": "status",
+        "component": component,
+        "state": state,
+        "ready": monitor.ready,
+        "timestamp": datetime.now().isoformat(),
+    }
+    if detail:
+        event["detail"] = detail
+    # Followers relay the owner's numbering; their own status stays in /api/health
+    if worker_ipc.role != "follower":
+        await manager.broadcast(event)
+
+
+async def start_reader(tasks: dict):
+    """Initialize the NFC reader off the event loop, then start the scan loop."""
+    from backend.api.websocket_manager import manager
+    from backend.api import nfc_scanner
+
+    if worker_ipc.role == "follower":
+        # Another worker owns the reader; relay its scan events instead
+        relay = worker_ipc.EventRelay()
+        monitor.reader_relay = relay
+        tasks["relay"] = asyncio.create_task(relay.run())
+        print("NFC reader: owned by another worker")
+        await report_startup("nfc_reader", "ready")
+        return
+    if worker_ipc.role == "owner":
+        hub = worker_ipc.EventHub(nfc_scanner.scanner)
+        await hub.start()
+        tasks["hub"] = hub
+
+    if await asyncio.to_thread(nfc_scanner.scanner.initialize):
+        print("NFC reader: OK")
+        # Set broadcast callback
+        nfc_scanner.scanner.set_broadcast_callback(manager.broadcast)
+        # Start scanner in background task
+        tasks["scanner"] = asyncio.create_task(nfc_scanner.scanner.scan_loop())
+        await report_startup("nfc_reader", "ready")
+    else:
+        print("Warning: NFC reader not available")
+        await report_startup("nfc_reader", "failed", "NFC reader not available")
 
-    # Validate config
+
+async def start_chain(tasks: dict):
+    """Validate config, start revocation sync and check Blockfrost without blocking startup."""
     errors = validate_config()
     if errors:
         print(f"Config errors: {errors}")
         print("Warning: Running without blockchain verification")
+        await report_startup("blockchain", "failed", "; ".join(errors))
+        return
+
+    tasks["revocation"] = asyncio.create_task(revocation_sync_loop())
+
+    # Signed cards are checked against the policy key; derive it before the first tap
+    if OFFLINE_VERIFY:
+        from backend.card_signature import load_verifier
+        try:
+            await asyncio.to_thread(load_verifier)
+        except Exception as e:
+            print(f"Offline verification unavailable: {e}")
 
     # Check blockchain connection
-    if check_connection():
+    if await asyncio.to_thread(check_connection):
         print("Blockchain connection: OK")
+        await report_startup("blockchain", "ready")
     else:
         print("Warning: Cannot connect to Blockfrost")
+        await report_startup("blockchain", "failed", "Cannot connect to Blockfrost")
 
-    # Initialize NFC scanner
-    from backend.api.websocket_manager import manager
+
+async def start_services(tasks: dict):
+    """Bring up the reader and chain checks in parallel, then start health probes."""
     from backend.api import nfc_scanner
 
-    if nfc_scanner.scanner.initialize():
-        print("NFC reader: OK")
-        # Set broadcast callback
-        nfc_scanner.scanner.set_broadcast_callback(manager.broadcast)
-        # Start scanner in background task
-        scanner_task = asyncio.create_task(nfc_scanner.scanner.scan_loop())
-    else:
-        print("Warning: NFC reader not available")
-        scanner_task = None
+    results = await asyncio.gather(start_reader(tasks), start_chain(tasks), return_exceptions=True)
+    for component, result in zip(("nfc_reader", "blockchain"), results):
+        if isinstance(result, Exception):
+            print(f"Startup of {component} failed: {result}")
+            await report_startup(component, "failed", str(result))
+    tasks["health"] = asyncio.create_task(monitor.run(nfc_scanner.scanner))
+    print("All services started")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup and shutdown events for the FastAPI app."""
+    # Startup: serve immediately, readiness is reported via /api/health and WebSocket
+    print("Starting NFC Verification Kiosk API...")
+    if worker_ipc.elect() != "single":
+        print(f"Worker {os.getpid()}: {worker_ipc.role}")
+    tasks = {"lag": asyncio.create_task(event_loop_lag_monitor())}
+
+    from backend.api import nfc_scanner
+
+    # Opening runs the schema script and may re-aggregate rollups; keep it off the loop
+    event_log = await asyncio.to_thread(EventLog, SCAN_LOG_PATH, gate=KIOSK_GATE) if SCAN_LOG_PATH else None
+    nfc_scanner.scanner.set_event_log(event_log)
+    tasks["startup"] = asyncio.create_task(start_services(tasks))
 
     print("API ready on port 5000")
 
@@ -55,6 +146,13 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     print("Shutting down...")
+
+    scanner_task = tasks.pop("scanner", None)
+    hub = tasks.pop("hub", None)
+    for task in tasks.values():
+        task.cancel()
+    if hub:
+        await hub.close()
     if scanner_task:
         nfc_scanner.scanner.stop()
         scanner_task.cancel()
@@ -64,6 +162,8 @@ async def lifespan(app: FastAPI):
             print("Scanner task cancelled")
         except asyncio.TimeoutError:
             print("Warning: Scanner task did not stop within timeout")
+    if event_log:
+        await asyncio.to_thread(event_log.close)
 
 
 app = FastAPI(
@@ -0,0 +1,190 @@
+"""
+Prometheus text-format metrics for the kiosk API (GET /metrics).
+Collects Blockfrost request stats and event-loop lag here; everything else
+is read from the scanner, WebSocket manager, NFC reader and revocation list
+counters at scrape time.
+"""
+
+import asyncio
+import time
+import threading
+from collections import Counter
+import sys
+import os
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import cardano
+from backend.card_keys import key_cache, reader_stats
+from backend.api.tracing import BUCKETS_MS, Histogram, histograms
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class BlockfrostStats:
+    """Request counts by endpoint/status and a latency histogram."""
+
+    def __init__(self):
+        self.requests = Counter()
+        self.latency = Histogram()
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, status: int, seconds: float):
+        with self._lock:
+            self.requests[(endpoint, status)] += 1
+            self.latency.observe(seconds * 1000)
+
+
+class LoopLag:
+    """Event-loop lag sampled by how late a fixed sleep wakes up."""
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.histogram.observe(ms)
+        self.last_ms = ms
+        self.max_ms = max(self.max_ms, ms)
+
+
+blockfrost_stats = BlockfrostStats()
+cardano.request_observers.append(blockfrost_stats.observe)
+
+loop_lag = LoopLag()
+
+
+async def event_loop_lag_monitor(interval: float = 0.5):
+    """Background task: record how far past `interval` each sleep overruns."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        loop_lag.observe(max(0.0, (time.perf_counter() - started - interval) * 1000))
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def _metric(lines, name, kind, help_text, samples):
+    """Append one metric family; samples are (labels dict, value) pairs."""
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(**labels)} {value}")
+
+
+def _histogram(lines, name, help_text, series):
+    """Append a histogram family from (labels dict, buckets, sum_ms, count) in ms; exported in seconds."""
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, buckets, sum_ms, count in series:
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS_MS, buckets):
+            cumulative += bucket
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound / 1000)} {cumulative}")
+        lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {count}')
+        lines.append(f"{name}_sum{_labels(**labels)} {sum_ms / 1000}")
+        lines.append(f"{name}_count{_labels(**labels)} {count}")
+
+
+def _ratio(hits, total):
+    return round(hits / total, 6) if total else 0
+
+
+def render_metrics(scanner, manager) -> str:
+    """Render all kiosk metrics in the Prometheus text exposition format."""
+    lines = []
+
+    _metric(lines, "kiosk_taps_total", "counter", "Cards detected and processed.",
+            [({}, scanner.stats["taps"])])
+    _metric(lines, "kiosk_taps_debounced_total", "counter", "Repeat taps dropped by the debounce window.",
+            [({}, scanner.stats["debounced"])])
+    _metric(lines, "kiosk_scan_outcomes_total", "counter", "Scan results by outcome.",
+            [({"outcome": outcome}, count) for outcome, count in sorted(scanner.outcomes.items())])
+
+    if scanner.event_log:
+        _metric(lines, "kiosk_scan_log_written_total", "counter", "Scan events committed to the scan log.",
+                [({}, scanner.event_log.written)])
+        _metric(lines, "kiosk_scan_log_dropped_total", "counter", "Scan events dropped because the write queue was full.",
+                [({}, scanner.event_log.dropped)])
+
+    _histogram(lines, "kiosk_stage_duration_seconds", "Per-stage scan latency (requires TRACE_STAGES).", [
+        ({"stage": stage}, h["buckets"], h["sum_ms"], h["count"])
+        for stage, h in sorted(histograms.snapshot().items())
+    ])
+
+    with blockfrost_stats._lock:
+        requests = sorted(blockfrost_stats.requests.items())
+        latency = blockfrost_stats.latency
+        latency_series = [({}, list(latency.counts), latency.total, latency.count)]
+    _metric(lines, "kiosk_blockfrost_requests_total", "counter", "Blockfrost requests by endpoint and HTTP status (0 = connection error).",
+            [({"endpoint": endpoint, "status": status}, count) for (endpoint, status), count in requests])
+    _metric(lines, "kiosk_blockfrost_rate_limited_total", "counter", "Blockfrost requests rejected with 429.",
+            [({}, sum(count for (_, status), count in requests if status == 429))])
+    _histogram(lines, "kiosk_blockfrost_request_duration_seconds", "Blockfrost request latency.", latency_series)
+
+    scheduler = cardano.scheduler
+    _metric(lines, "kiosk_blockfrost_scheduler_granted_total", "counter", "Request slots granted by the scheduler.",
+            [({}, scheduler.stats["granted"])])
+    _metric(lines, "kiosk_blockfrost_scheduler_rejected_total", "counter", "Requests refused for lack of budget (RateLimited).",
+            [({}, scheduler.stats["rate_limited"])])
+    _metric(lines, "kiosk_blockfrost_scheduler_backoffs_total", "counter", "Pauses after a 429 from Blockfrost.",
+            [({}, scheduler.stats["backoffs"])])
+    _metric(lines, "kiosk_blockfrost_scheduler_wait_seconds_total", "counter", "Time callers spent waiting for a slot.",
+            [({}, round(scheduler.stats["wait_seconds"], 6))])
+    _metric(lines, "kiosk_blockfrost_scheduler_queued", "gauge", "Callers waiting for a request slot.",
+            [({}, scheduler.queued)])
+    _metric(lines, "kiosk_blockfrost_daily_requests", "gauge", "Requests counted against today's quota.",
+            [({}, scheduler.used_today)])
+
+    revocations = cardano.revocations
+    offline_hits = scanner.stats["offline_metadata_hits"]
+    offline_total = offline_hits + scanner.stats["offline_metadata_misses"]
+    _metric(lines, "kiosk_cache_hit_ratio", "gauge", "Lookups served from a local cache.", [
+        ({"cache": "revocation_bloom"}, _ratio(revocations.fast_path, revocations.lookups)),
+        ({"cache": "offline_metadata"}, _ratio(offline_hits, offline_total)),
+        ({"cache": "asset"}, _ratio(cardano.asset_cache.hits, cardano.asset_cache.hits + cardano.asset_cache.misses)),
+        ({"cache": "card_keys"}, _ratio(key_cache.hits, key_cache.hits + key_cache.misses)),
+    ])
+    _metric(lines, "kiosk_revocations", "gauge", "Assets in the local revocation list.",
+            [({}, len(revocations))])
+
+    stats = reader_stats
+    _metric(lines, "kiosk_nfc_block_operations_total", "counter", "MIFARE block operations by the card reader.", [
+        ({"op": "auth"}, stats["auth"]),
+        ({"op": "read"}, stats["read"]),
+    ])
+    _metric(lines, "kiosk_nfc_block_failures_total", "counter", "Failed MIFARE block operations.", [
+        ({"op": "auth"}, stats["auth_failed"]),
+        ({"op": "read"}, stats["read_failed"]),
+    ])
+    _metric(lines, "kiosk_nfc_auth_failure_ratio", "gauge", "Share of block authentications that failed.",
+            [({}, _ratio(stats["auth_failed"], stats["auth"]))])
+
+    _metric(lines, "kiosk_event_loop_lag_seconds", "gauge", "Most recent event-loop lag sample.",
+            [({}, loop_lag.last_ms / 1000)])
+    _metric(lines, "kiosk_event_loop_lag_max_seconds", "gauge", "Largest event-loop lag seen.",
+            [({}, loop_lag.max_ms / 1000)])
+    h = loop_lag.histogram
+    _histogram(lines, "kiosk_event_loop_lag_duration_seconds", "Event-loop lag samples.",
+               [({}, list(h.counts), h.total, h.count)])
+
+    encodings = Counter(manager.encodings.values())
+    encodings["json"] = manager.connection_count - sum(encodings.values())
+    _metric(lines, "kiosk_websocket_clients", "gauge", "Connected WebSocket clients by encoding.",
+            [({"encoding": encoding}, count) for encoding, count in sorted(encodings.items())])
+    _metric(lines, "kiosk_websocket_pending_sends", "gauge", "Broadcast messages queued but not yet written.",
+            [({}, manager.pending_sends)])
+    _metric(lines, "kiosk_websocket_pending_sends_max", "gauge", "Peak broadcast send queue depth.",
+            [({}, manager.max_pending_sends)])
+    _metric(lines, "kiosk_websocket_broadcasts_total", "counter", "Events broadcast to WebSocket clients.",
+            [({}, manager.broadcasts)])
+    _metric(lines, "kiosk_websocket_send_failures_total", "counter", "Failed WebSocket sends (client dropped).",
+            [({}, manager.send_failures)])
+
+    return "\n".join(lines) + "\n"
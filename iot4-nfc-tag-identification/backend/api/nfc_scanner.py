@@ -5,7 +5,9 @@ Includes 3-second debounce to prevent duplicate scans.
 """
 
 import asyncio
+import threading
 import time
+from collections import Counter
 from datetime import datetime
 from typing import Optional, Callable, Awaitable
 import sys
@@ -14,18 +16,36 @@ import os
 # Add backend directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.nfc import init_pn532, read_json_from_nfc
-from backend.cardano import query_asset
+from backend.nfc import init_pn532, detect_card
+from backend.card_keys import key_cache, read_card_json
+from backend.cardano import get_asset, is_revoked
+from backend.blockfrost_scheduler import INTERACTIVE, BACKGROUND
+from backend.card_signature import verify_card
+from backend.config import OFFLINE_VERIFY
+from backend.api.tracing import NULL_TRACE, histograms, new_trace
 
 
 # Debounce time in seconds
 DEBOUNCE_SECONDS = 3.0
 
 
-def verify_on_blockchain(policy_id: str, asset_name_hex: str, student_id: str) -> dict:
-    """Verify student NFT on Cardano blockchain."""
+def verify_on_blockchain(
+    policy_id: str, asset_name_hex: str, student_id: str, trace=NULL_TRACE, priority: int = INTERACTIVE,
+    max_age: float = 0.0, max_wait: float = 10.0,
+) -> dict:
+    """
+    Verify student NFT on Cardano blockchain.
+    max_age > 0 accepts a cached asset lookup up to that many seconds old.
+    """
+    # Burned NFTs are rejected before any lookup or cached metadata is trusted
+    with trace.span("revocation_check"):
+        revoked = is_revoked(policy_id, asset_name_hex)
+    if revoked:
+        return {"verified": False, "error": "Revoked", "student_id": student_id}
+
     try:
-        asset = query_asset(policy_id, asset_name_hex)
+        with trace.span("query_asset"):
+            asset = get_asset(policy_id, asset_name_hex, priority=priority, max_age=max_age, max_wait=max_wait)
     except Exception as e:
         return {"verified": False, "error": f"Blockchain error: {str(e)}", "student_id": student_id}
 
@@ -47,6 +67,13 @@ def verify_on_blockchain(policy_id: str, asset_name_hex: str, student_id: str) -
     }
 
 
+def _outcome(result: dict) -> str:
+    """Metric label for a scan result: verified, offline or the error reason."""
+    if result.get("verified"):
+        return "offline" if result.get("offline") else "verified"
+    return result.get("error", "unknown").split(":")[0].strip().lower().replace(" ", "_")
+
+
 class NFCScanner:
     """Background NFC scanner with debounce and WebSocket broadcast."""
 
@@ -56,20 +83,55 @@ class NFCScanner:
         self.last_uid: Optional[str] = None
         self.last_scan_time: float = 0
         self.broadcast_callback: Optional[Callable[[dict], Awaitable[None]]] = None
+        # Student details from on-chain confirmations, keyed by policy + asset
+        self.offline_metadata: dict[str, dict] = {}
+        # Counters for /metrics
+        self.stats = Counter()
+        self.outcomes = Counter()
+        # Optional EventLog receiving every scan result
+        self.event_log = None
+        self._detected_at = 0.0
+        # Serializes reader I/O between scans and health probes
+        self.reader_lock = threading.Lock()
+        # Pending on-chain re-checks of offline-verified cards
+        self._confirm_tasks: set[asyncio.Task] = set()
 
     def initialize(self) -> bool:
         """Initialize NFC reader. Returns True if successful."""
         try:
             self.pn532 = init_pn532()
+            if key_cache.enabled:
+                print(f"Loaded {key_cache.load()} card key(s)")
             return True
         except Exception as e:
             print(f"NFC init failed: {e}")
             return False
 
+    def _with_reader(self, func, *args, **kwargs):
+        """Run one blocking reader operation while holding the reader lock."""
+        with self.reader_lock:
+            return func(self.pn532, *args, **kwargs)
+
+    def probe_reader(self, lock_timeout: float = 1.0) -> bool:
+        """Cheap liveness check (firmware version query); False if the reader is busy too long or fails."""
+        if not self.pn532 or not self.reader_lock.acquire(timeout=lock_timeout):
+            return False
+        try:
+            self.pn532.firmware_version
+            return True
+        except Exception:
+            return False
+        finally:
+            self.reader_lock.release()
+
     def set_broadcast_callback(self, callback: Callable[[dict], Awaitable[None]]):
         """Set async callback for broadcasting scan results."""
         self.broadcast_callback = callback
 
+    def set_event_log(self, event_log):
+        """Record every scan result in an append-only EventLog."""
+        self.event_log = event_log
+
     def _should_process_card(self, uid_str: str) -> bool:
         """Check if card should be processed (debounce logic)."""
         now = time.time()
@@ -77,26 +139,31 @@ class NFCScanner:
             return False
         return True
 
-    async def _try_read_card(self) -> tuple[Optional[str], Optional[dict]]:
+    async def _try_read_card(self, trace=NULL_TRACE) -> tuple[Optional[str], Optional[dict]]:
         """Attempt to read NFC card. Returns (uid_str, data) or (None, None)."""
         if not self.pn532:
             return None, None
 
         try:
             # Run blocking I/O in thread pool to avoid blocking event loop
-            uid = await asyncio.to_thread(
-                self.pn532.read_passive_target,
-                timeout=0.5
-            )
-            if uid is None:
+            started = time.perf_counter()
+            card = await asyncio.to_thread(self._with_reader, detect_card, timeout=0.5)
+            if card is None:
                 return None, None
+            self._detected_at = started
+            if trace:
+                # Idle polls are not traced; the trace starts with the detecting poll
+                trace.started = started
+                trace.add("read_passive_target", time.perf_counter() - started)
 
-            uid_str = "".join(f"{b:02X}" for b in uid)
+            uid_str = "".join(f"{b:02X}" for b in card.uid)
             data = await asyncio.to_thread(
-                read_json_from_nfc,
-                self.pn532,
-                num_blocks=8,
-                debug=False
+                self._with_reader,
+                read_card_json,
+                card=card,
+                num_blocks=16,
+                debug=False,
+                trace=trace or None,
             )
             return uid_str, data
         except Exception as e:
@@ -107,67 +174,127 @@ class NFCScanner:
         """Public method to read card with timeout. Returns verification result."""
         start = time.time()
         while (time.time() - start) < timeout:
-            uid_str, nfc_data = await self._try_read_card()
+            trace = new_trace()
+            uid_str, nfc_data = await self._try_read_card(trace)
             if uid_str:
-                return await self._process_scan(uid_str, nfc_data)
+                return await self._process_scan(uid_str, nfc_data, trace)
             await asyncio.sleep(0.3)
         raise TimeoutError("No card detected within timeout")
 
-    async def _process_scan(self, uid_str: str, nfc_data: Optional[dict]) -> dict:
+    async def _process_scan(self, uid_str: str, nfc_data: Optional[dict], trace=NULL_TRACE) -> dict:
         """Process NFC scan and return result."""
         timestamp = datetime.now().isoformat()
 
         if not nfc_data:
-            return {
-                "event": "scan",
+            result = {
                 "verified": False,
                 "error": "Could not read card data",
-                "uid": uid_str,
-                "timestamp": timestamp,
             }
-
-        if not all(f in nfc_data for f in ["p", "a", "s"]):
-            return {
-                "event": "scan",
+        elif not all(f in nfc_data for f in ["p", "a", "s"]):
+            result = {
                 "verified": False,
                 "error": "Invalid card format",
-                "uid": uid_str,
-                "timestamp": timestamp,
             }
-
-        # Verify on blockchain
-        result = verify_on_blockchain(nfc_data["p"], nfc_data["a"], nfc_data["s"])
+        elif OFFLINE_VERIFY and "g" in nfc_data and self._verify_offline(nfc_data, uid_str, trace):
+            result = self._offline_result(nfc_data)
+            task = asyncio.create_task(self._confirm_on_chain(nfc_data, uid_str, timestamp))
+            self._confirm_tasks.add(task)
+            task.add_done_callback(self._confirm_tasks.discard)
+        else:
+            # Verify on blockchain; the scheduler may block (e.g. during a 429 pause), so off the loop
+            result = await asyncio.to_thread(verify_on_blockchain, nfc_data["p"], nfc_data["a"], nfc_data["s"], trace)
         result["event"] = "scan"
         result["uid"] = uid_str
         result["timestamp"] = timestamp
+        self.stats["taps"] += 1
+        self.outcomes[_outcome(result)] += 1
+        if self.event_log:
+            self.event_log.append(result, latency_ms=(time.perf_counter() - self._detected_at) * 1000)
+        if trace:
+            result["stages"] = trace.finish()
 
         return result
 
+    def _verify_offline(self, nfc_data: dict, uid_str: str, trace=NULL_TRACE) -> bool:
+        """Signed card that is not revoked and whose signature checks out."""
+        with trace.span("revocation_check"):
+            if is_revoked(nfc_data["p"], nfc_data["a"]):
+                return False
+        with trace.span("signature_check"):
+            return verify_card(nfc_data, uid_str)
+
+    def _offline_result(self, nfc_data: dict) -> dict:
+        """Result for a card whose signature checked out locally."""
+        details = self.offline_metadata.get(nfc_data["p"] + nfc_data["a"])
+        self.stats["offline_metadata_hits" if details else "offline_metadata_misses"] += 1
+        details = details or {}
+        return {
+            "verified": True,
+            "offline": True,
+            "student_id": nfc_data["s"],
+            "student_name": details.get("student_name", ""),
+            "department": details.get("department", ""),
+            "issued_at": details.get("issued_at", ""),
+        }
+
+    async def _confirm_on_chain(self, nfc_data: dict, uid_str: str, timestamp: str):
+        """Re-check an offline-verified card on chain; broadcast a failure if it was revoked."""
+        result = await asyncio.to_thread(
+            verify_on_blockchain, nfc_data["p"], nfc_data["a"], nfc_data["s"], priority=BACKGROUND
+        )
+        if result["verified"]:
+            self.offline_metadata[nfc_data["p"] + nfc_data["a"]] = result
+            return
+        if result.get("error", "").startswith("Blockchain error"):
+            # Chain unreachable: keep the offline result
+            return
+
+        self.offline_metadata.pop(nfc_data["p"] + nfc_data["a"], None)
+        result["event"] = "scan"
+        result["uid"] = uid_str
+        # New timestamp so displays treat this as a fresh event
+        result["timestamp"] = datetime.now().isoformat()
+        result["scanned_at"] = timestamp
+        print(f"Offline-verified card failed on-chain check: {result}")
+        if self.event_log:
+            # Corrects the tap already logged, so it must not count as a second one
+            self.event_log.append(result, kind="correction")
+        if self.broadcast_callback:
+            await self.broadcast_callback(result)
+
     async def scan_loop(self):
         """Main scanning loop. Call this from asyncio task."""
         self.running = True
         print("NFC scanner started")
 
         while self.running:
-            uid_str, nfc_data = await self._try_read_card()
+            trace = new_trace()
+            uid_str, nfc_data = await self._try_read_card(trace)
 
-            if uid_str and self._should_process_card(uid_str):
+            if uid_str and not self._should_process_card(uid_str):
+                self.stats["debounced"] += 1
+            elif uid_str:
                 self.last_uid = uid_str
                 self.last_scan_time = time.time()
 
-                result = await self._process_scan(uid_str, nfc_data)
+                result = await self._process_scan(uid_str, nfc_data, trace)
                 print(f"Scan result: {result}")
 
                 if self.broadcast_callback:
+                    started = time.perf_counter()
                     await self.broadcast_callback(result)
+                    if trace:
+                        histograms.observe("broadcast", (time.perf_counter() - started) * 1000)
 
             await asyncio.sleep(0.3)
 
         print("NFC scanner stopped")
 
     def stop(self):
-        """Stop the scanning loop."""
+        """Stop the scanning loop and cancel pending on-chain confirmations."""
         self.running = False
+        for task in list(self._confirm_tasks):
+            task.cancel()
 
 
 # Singleton instance
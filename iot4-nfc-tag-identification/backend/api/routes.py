@@ -1,10 +1,13 @@
 """
 FastAPI routes for NFC verification kiosk.
-Endpoints: GET /api/health, POST /api/verify, WS /ws/scan
+Endpoints: GET /api/health, GET /metrics, GET /api/scans, GET /api/analytics/*,
+POST /api/verify, POST /api/verify/batch, WS /ws/scan
 """
 
 import asyncio
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+from typing import Literal, Optional
+from fastapi import APIRouter, WebSocket, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from datetime import datetime
 import sys
 import os
@@ -12,28 +15,102 @@ import os
 # Add backend directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.cardano import check_connection
-from backend.api.websocket_manager import manager
+from backend.api.websocket_manager import manager, negotiate
 from backend.api import nfc_scanner
+from backend.api.health import monitor
+from backend.api.metrics import CONTENT_TYPE, render_metrics
+from backend.api import analytics
+from backend.api import worker_ipc
+from backend.api.batch_verify import BatchRequest, verify_batch
+from backend.config import BATCH_VERIFY_CONCURRENCY, BATCH_VERIFY_MAX_ITEMS
 
 router = APIRouter()
 
 
 @router.get("/api/health")
 async def health_check():
-    """Health check endpoint. Returns server and NFC reader status."""
-    nfc_ok = nfc_scanner.scanner.pn532 is not None
-    blockchain_ok = check_connection()
+    """Health check endpoint. Answers from the background monitor's cached snapshot."""
+    health = monitor.status()
+    health["timestamp"] = datetime.now().isoformat()
+    health["websocket_clients"] = manager.connection_count
+    return health
 
-    return {
-        "status": "ok" if (nfc_ok and blockchain_ok) else "degraded",
-        "timestamp": datetime.now().isoformat(),
-        "services": {
-            "nfc_reader": "connected" if nfc_ok else "disconnected",
-            "blockchain": "connected" if blockchain_ok else "disconnected",
-        },
-        "websocket_clients": manager.connection_count,
-    }
+
+@router.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint: taps, outcomes, latencies, Blockfrost and reader stats."""
+    return Response(render_metrics(nfc_scanner.scanner, manager), media_type=CONTENT_TYPE)
+
+
+def _event_log():
+    event_log = nfc_scanner.scanner.event_log
+    if not event_log:
+        raise HTTPException(status_code=503, detail="Scan log disabled")
+    return event_log
+
+
+@router.get("/api/scans")
+async def list_scans(
+    uid: Optional[str] = None,
+    student_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 1000,
+    include_data: bool = False,
+):
+    """Logged scan events, newest first, e.g. ?student_id=2025001&since=2025-12-01T00:00:00."""
+    event_log = _event_log()
+    events = await asyncio.to_thread(
+        event_log.query,
+        uid=uid,
+        student_id=student_id,
+        since=since.timestamp() if since else None,
+        until=until.timestamp() if until else None,
+        limit=min(limit, 10000),
+        include_data=include_data,
+    )
+    return {"count": len(events), "events": events}
+
+
+@router.get("/api/analytics/taps")
+async def analytics_taps(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    gate: Optional[str] = None,
+    resolution: Literal["minute", "hour", "day"] = "minute",
+    format: str = "json",
+):
+    """Taps per gate per minute/hour/day with verified/failed counts and mean latency."""
+    rows = _event_log().taps(analytics.timestamp(since), analytics.timestamp(until), gate, resolution)
+    return await analytics.respond(rows, format, "taps")
+
+
+@router.get("/api/analytics/latency")
+async def analytics_latency(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    gate: Optional[str] = None,
+    top: Optional[int] = None,
+    format: str = "json",
+):
+    """Tap-to-result latency percentiles per hour; `top=N` returns the N busiest hours."""
+    rows = _event_log().latency_by_hour(analytics.timestamp(since), analytics.timestamp(until), gate)
+    if top:
+        hours = await asyncio.to_thread(list, rows)
+        rows = sorted(hours, key=lambda row: row["taps"], reverse=True)[:top]
+    return await analytics.respond(rows, format, "latency")
+
+
+@router.get("/api/analytics/students")
+async def analytics_students(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    gate: Optional[str] = None,
+    format: str = "json",
+):
+    """Unique verified students per day."""
+    rows = _event_log().unique_students(analytics.timestamp(since), analytics.timestamp(until), gate)
+    return await analytics.respond(rows, format, "students")
 
 
 @router.post("/api/verify")
@@ -42,6 +119,15 @@ async def manual_verify():
     Manually trigger NFC scan and verification.
     Waits for card to be placed on reader (max 10 seconds).
     """
+    if worker_ipc.role == "follower":
+        try:
+            status, body = await worker_ipc.read_once(timeout=10.0)
+        except (OSError, ValueError, asyncio.TimeoutError):
+            raise HTTPException(status_code=503, detail="NFC reader worker unreachable")
+        if status != 200:
+            raise HTTPException(status_code=status, detail=body)
+        return body
+
     if not nfc_scanner.scanner.pn532:
         raise HTTPException(status_code=503, detail="NFC reader not initialized")
 
@@ -52,26 +138,51 @@ async def manual_verify():
         raise HTTPException(status_code=408, detail="No card detected within timeout")
 
 
+@router.post("/api/verify/batch")
+async def batch_verify(request: BatchRequest, concurrency: int = BATCH_VERIFY_CONCURRENCY):
+    """
+    Verify many {policy_id, asset_name_hex, student_id} items without a tap.
+    Streams NDJSON as results complete: one line per unique item (with the
+    request positions it answers in "indexes"), then a "summary" line.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No items")
+    if len(request.items) > BATCH_VERIFY_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_VERIFY_MAX_ITEMS} items per batch")
+    concurrency = max(1, min(concurrency, BATCH_VERIFY_CONCURRENCY))
+    return StreamingResponse(verify_batch(request.items, concurrency), media_type="application/x-ndjson")
+
+
 @router.websocket("/ws/scan")
 async def websocket_scan(websocket: WebSocket):
     """
     WebSocket endpoint for real-time NFC scan events.
-    Clients receive JSON messages when cards are scanned.
+    Clients receive JSON messages when cards are scanned, or binary frames when
+    they request the "cbor" or "msgpack" subprotocol. Reconnecting with
+    ?since=<seq>&epoch=<epoch> first delivers missed events in one "replay" frame.
     """
-    await manager.connect(websocket)
+    since = websocket.query_params.get("since")
+    encoding = negotiate(websocket.scope.get("subprotocols", []))
     try:
-        # Send initial connection confirmation
-        await websocket.send_json({
-            "event": "connected",
-            "timestamp": datetime.now().isoformat(),
-            "message": "Connected to NFC scan events",
-        })
-
-        # Keep connection alive and wait for disconnection
+        await manager.connect(
+            websocket,
+            # Initial connection confirmation
+            hello={
+                "event": "connected",
+                "timestamp": datetime.now().isoformat(),
+                "message": "Connected to NFC scan events",
+                "ready": monitor.ready,
+                "startup": dict(monitor.startup),
+            },
+            since=int(since) if since and since.isdigit() else None,
+            epoch=websocket.query_params.get("epoch"),
+            encoding=encoding,
+        )
+
+        # Keep connection alive and wait for disconnection (text or binary pings)
         while True:
-            try:
-                await websocket.receive_text()
-            except WebSocketDisconnect:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
                 break
     finally:
         manager.disconnect(websocket)
@@ -0,0 +1,126 @@
+"""
+Lightweight per-stage tracing for the verification pipeline.
+Each scan gets a Trace that records stage durations; finished traces feed
+in-memory histograms. With TRACE_STAGES off, new_trace() returns a shared
+no-op trace, so the hot path only pays a falsy check per stage.
+"""
+
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+import sys
+import os
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import TRACE_STAGES
+
+
+# Histogram bucket upper bounds in milliseconds (last bucket is +Inf)
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (milliseconds)."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, ms: float):
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += ms
+        self.count += 1
+
+
+class StageHistograms:
+    """Per-stage histograms shared by all scanners."""
+
+    def __init__(self):
+        self.stages: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, ms: float):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                stage: {"buckets": list(h.counts), "sum_ms": round(h.total, 3), "count": h.count}
+                for stage, h in self.stages.items()
+            }
+
+
+class Trace:
+    """Stage timings for one scan."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float):
+        """Accumulate time for a stage (repeated stages such as per-block auth are summed)."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def as_ms(self) -> dict:
+        return {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()}
+
+    def finish(self) -> dict:
+        """Record stages (plus total) into the histograms; returns timings in ms."""
+        self.stages["total"] = time.perf_counter() - self.started
+        for stage, seconds in self.stages.items():
+            histograms.observe(stage, seconds * 1000)
+        return self.as_ms()
+
+
+_NULL_SPAN = nullcontext()
+
+
+class _NullTrace:
+    """Disabled tracing: every call is a no-op."""
+
+    def __bool__(self):
+        return False
+
+    def add(self, stage: str, seconds: float):
+        pass
+
+    def span(self, stage: str):
+        return _NULL_SPAN
+
+    def as_ms(self) -> dict:
+        return {}
+
+    def finish(self) -> dict:
+        return {}
+
+
+NULL_TRACE = _NullTrace()
+
+# Singleton histograms
+histograms = StageHistograms()
+
+
+def new_trace():
+    return Trace() if TRACE_STAGES else NULL_TRACE
@@ -1,39 +1,213 @@
 """
 WebSocket connection manager for real-time NFC scan events.
 Handles multiple client connections and broadcasts scan results.
+Every broadcast gets a sequence number and is kept in a bounded replay ring,
+so reconnecting clients can catch up with ?since=<seq>.
+
+Clients speak JSON text frames unless they request the "cbor" or "msgpack"
+WebSocket subprotocol; each event is encoded at most once per encoding and
+the bytes are shared by all subscribers using it.
 """
 
 from fastapi import WebSocket
-from typing import List
+from typing import List, Optional
+from collections import deque
+from importlib.util import find_spec
 import json
+import secrets
+import sys
+import os
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import WS_REPLAY_SIZE
+
+
+def _cbor(data) -> bytes:
+    # cbor2 is installed with pycardano
+    import cbor2
+    return cbor2.dumps(data)
+
+
+def _msgpack(data) -> bytes:
+    import msgpack
+    return msgpack.packb(data)
+
+
+# Binary encodings by subprotocol name; JSON text is the default
+CODECS = {"cbor": (_cbor, "cbor2"), "msgpack": (_msgpack, "msgpack")}
+
+
+def supported_encodings() -> List[str]:
+    """Subprotocols this server can speak, skipping codecs whose package is missing."""
+    return ["json"] + [name for name, (_, module) in CODECS.items() if find_spec(module)]
+
+
+def negotiate(requested: List[str]) -> Optional[str]:
+    """First subprotocol the client asked for that we support, else None (plain JSON)."""
+    supported = supported_encodings()
+    return next((name for name in requested if name in supported), None)
+
+
+class Event:
+    """A stamped broadcast: JSON text plus binary encodings built on first use."""
+
+    __slots__ = ("seq", "text", "_data", "_encoded")
+
+    def __init__(self, seq: int, text: str, data: Optional[dict] = None):
+        self.seq = seq
+        self.text = text
+        self._data = data
+        self._encoded = {}
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = json.loads(self.text)
+        return self._data
+
+    def encoded(self, encoding: str):
+        if encoding == "json":
+            return self.text
+        payload = self._encoded.get(encoding)
+        if payload is None:
+            payload = self._encoded[encoding] = CODECS[encoding][0](self.data)
+        return payload
+
+
+async def _send_frame(websocket: WebSocket, payload):
+    if isinstance(payload, bytes):
+        await websocket.send_bytes(payload)
+    else:
+        await websocket.send_text(payload)
 
 
 class WebSocketManager:
     """Manages WebSocket connections for broadcasting NFC scan events."""
 
-    def __init__(self):
+    def __init__(self, replay_size: int = WS_REPLAY_SIZE):
         self.active_connections: List[WebSocket] = []
+        # Sequence numbers restart with the process; epoch tells clients which run they belong to
+        self.epoch = secrets.token_hex(4)
+        self.seq = 0
+        self.replay: deque[Event] = deque(maxlen=replay_size)
+        # Negotiated encoding per connection (absent = json)
+        self.encodings = {}
+        # Sends started but not yet written, plus totals for metrics
+        self.pending_sends = 0
+        self.max_pending_sends = 0
+        self.broadcasts = 0
+        self.send_failures = 0
+        # Callables observer(seq, message) for every event stamped here (worker IPC hub)
+        self.observers = []
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        hello: Optional[dict] = None,
+        since: Optional[int] = None,
+        epoch: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ):
+        """
+        Accept new WebSocket connection and add to pool.
+        Sends `hello` first; with `since`, replays missed events in a "replay" frame
+        before the client joins the broadcast pool, so events arrive in order.
+        `encoding` is the negotiated subprotocol (None = JSON without a subprotocol).
+        """
+        await websocket.accept(subprotocol=encoding)
+        encoding = encoding or "json"
+        if hello is not None:
+            hello = Event(self.seq, json.dumps(dict(hello, seq=self.seq, epoch=self.epoch)))
+            await _send_frame(websocket, hello.encoded(encoding))
 
-    async def connect(self, websocket: WebSocket):
-        """Accept new WebSocket connection and add to pool."""
-        await websocket.accept()
+        if since is not None:
+            # A different epoch means the server restarted: everything retained is new
+            last = since if epoch in (None, self.epoch) else 0
+            while True:
+                frame = self._replay_frame(last, encoding)
+                last = self.seq
+                await _send_frame(websocket, frame)
+                # Repeat for events broadcast while the frame was being sent
+                if self.seq == last:
+                    break
+
+        # No await between the last check and joining the pool
         self.active_connections.append(websocket)
+        if encoding != "json":
+            self.encodings[websocket] = encoding
+
+    def _replay_frame(self, since: int, encoding: str = "json"):
+        """Batched frame of retained events after `since`; JSON is spliced from the stored text."""
+        oldest = self.replay[0].seq if self.replay else self.seq + 1
+        events = [event for event in self.replay if event.seq > since]
+        header = {
+            "event": "replay",
+            "since": since,
+            "seq": self.seq,
+            "epoch": self.epoch,
+            # Events between `since` and the oldest retained one have been evicted
+            "truncated": since + 1 < oldest,
+        }
+        if encoding != "json":
+            return CODECS[encoding][0](dict(header, events=[event.data for event in events]))
+        return json.dumps(header)[:-1] + ', "events": [' + ", ".join(event.text for event in events) + "]}"
 
     def disconnect(self, websocket: WebSocket):
         """Remove WebSocket from connection pool."""
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        self.encodings.pop(websocket, None)
 
     async def broadcast(self, data: dict):
         """Send data to all connected clients."""
+        self.seq += 1
+        data = dict(data, seq=self.seq)
         message = json.dumps(data)
+        for observer in self.observers:
+            observer(self.seq, message)
+        await self._send(Event(self.seq, message, data))
+
+    async def relay(self, seq: int, message: str):
+        """Deliver an event already stamped by the reader-owning worker."""
+        self.seq = seq
+        await self._send(Event(seq, message))
+
+    async def adopt(self, epoch: str, seq: int):
+        """
+        Follow another process's numbering; `seq` precedes the next relayed event.
+        A new epoch closes clients so they reconnect and see it, and any gap
+        empties the replay ring.
+        """
+        if epoch != self.epoch:
+            self.epoch = epoch
+            for connection in list(self.active_connections):
+                self.disconnect(connection)
+                try:
+                    await connection.close(code=1012)
+                except Exception:
+                    pass
+            self.replay.clear()
+        elif seq != self.seq:
+            self.replay.clear()
+        self.seq = seq
+
+    async def _send(self, event: Event):
+        self.replay.append(event)
         disconnected = []
+        self.broadcasts += 1
+        self.pending_sends += len(self.active_connections)
+        self.max_pending_sends = max(self.max_pending_sends, self.pending_sends)
 
-        for connection in self.active_connections:
+        for connection in list(self.active_connections):
             try:
-                await connection.send_text(message)
+                await _send_frame(connection, event.encoded(self.encodings.get(connection, "json")))
             except Exception:
+                self.send_failures += 1
                 disconnected.append(connection)
+            finally:
+                self.pending_sends -= 1
 
         # Clean up disconnected clients
         for conn in disconnected:
@@ -0,0 +1,167 @@
+"""
+Scan event fan-out between uvicorn workers (API_WORKERS > 1).
+Every worker runs the app lifespan; the first to take an exclusive lock next
+to IPC_SOCKET_PATH owns the NFC reader and serves on that Unix socket:
+- "subscribe": stamped events as "<seq> <json>" lines, after catching up from
+  the follower's last seq out of the owner's replay ring
+- "read_once": one manual scan for POST /api/verify on another worker
+Followers relay events to their own WebSocket clients under the owner's seq
+and epoch, so a client can reconnect to any worker with ?since=<seq>.
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import sys
+
+# Add backend directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.websocket_manager import manager
+from backend.config import API_WORKERS, IPC_SOCKET_PATH
+
+# Events can exceed asyncio's default 64 KiB line limit
+LINE_LIMIT = 1024 * 1024
+# A subscriber this far behind is dropped; it catches up on reconnect
+MAX_SUBSCRIBER_BUFFER = 4 * 1024 * 1024
+RECONNECT_SECONDS = 1.0
+
+# This process's part: single (one worker), owner or follower
+role = "single"
+_reader_lock = None
+
+
+def elect(workers: int = API_WORKERS, path: str = IPC_SOCKET_PATH) -> str:
+    """Decide this worker's role; the owner keeps the lock until the process exits."""
+    global role, _reader_lock
+    if workers <= 1:
+        return role
+    handle = open(path + ".lock", "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        role = "follower"
+    else:
+        _reader_lock = handle
+        role = "owner"
+    return role
+
+
+def _encode(data: dict) -> bytes:
+    return (json.dumps(data) + "\n").encode()
+
+
+class EventHub:
+    """Owner side: streams stamped events to followers and serves forwarded reads."""
+
+    def __init__(self, scanner, path: str = IPC_SOCKET_PATH):
+        self.scanner = scanner
+        self.path = path
+        self.subscribers = set()
+        self.server = None
+
+    async def start(self):
+        # A socket file left behind is stale: its owner no longer holds the lock
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = await asyncio.start_unix_server(self._handle, path=self.path, limit=LINE_LIMIT)
+        manager.observers.append(self._publish)
+
+    async def close(self):
+        if self._publish in manager.observers:
+            manager.observers.remove(self._publish)
+        for writer in list(self.subscribers):
+            writer.close()
+            await writer.wait_closed()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _publish(self, seq: int, message: str):
+        line = f"{seq} {message}\n".encode()
+        for writer in list(self.subscribers):
+            if writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BUFFER:
+                print("Dropping slow event subscriber")
+                self.subscribers.discard(writer)
+                writer.close()
+                continue
+            writer.write(line)
+
+    def _subscribe(self, writer, since: int, epoch: str):
+        """Send the catch-up point and missed events, then join; no await in between."""
+        oldest = manager.replay[0].seq if manager.replay else manager.seq + 1
+        start = since if epoch == manager.epoch and since + 1 >= oldest else oldest - 1
+        writer.write(_encode({"epoch": manager.epoch, "seq": start}))
+        for event in manager.replay:
+            if event.seq > start:
+                writer.write(f"{event.seq} {event.text}\n".encode())
+        self.subscribers.add(writer)
+
+    async def _read_once(self, timeout: float) -> dict:
+        if not self.scanner.pn532:
+            return {"status": 503, "body": "NFC reader not initialized"}
+        try:
+            return {"status": 200, "body": await self.scanner.read_card_once(timeout=timeout)}
+        except TimeoutError:
+            return {"status": 408, "body": "No card detected within timeout"}
+
+    async def _handle(self, reader, writer):
+        try:
+            request = json.loads(await reader.readline() or b"{}")
+            if request.get("op") == "subscribe":
+                self._subscribe(writer, int(request.get("since", 0)), request.get("epoch"))
+                await reader.read()  # until the follower disconnects
+            elif request.get("op") == "read_once":
+                writer.write(_encode(await self._read_once(float(request.get("timeout", 10.0)))))
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            print(f"IPC client error: {e}")
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+
+
+class EventRelay:
+    """Follower side: subscribes to the owner and re-broadcasts to local WebSocket clients."""
+
+    def __init__(self, path: str = IPC_SOCKET_PATH):
+        self.path = path
+        self.connected = False
+
+    async def run(self):
+        """Background task: stay subscribed, reconnecting whenever the owner goes away."""
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=LINE_LIMIT)
+            except OSError:
+                await asyncio.sleep(RECONNECT_SECONDS)
+                continue
+            try:
+                writer.write(_encode({"op": "subscribe", "since": manager.seq, "epoch": manager.epoch}))
+                hello = json.loads(await reader.readline())
+                await manager.adopt(hello["epoch"], hello["seq"])
+                self.connected = True
+                while line := await reader.readline():
+                    seq, _, message = line.decode().rstrip("\n").partition(" ")
+                    await manager.relay(int(seq), message)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Event relay error: {e}")
+            finally:
+                self.connected = False
+                writer.close()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+
+async def read_once(timeout: float, path: str = IPC_SOCKET_PATH):
+    """Ask the reader-owning worker for one manual scan; returns (status, body)."""
+    reader, writer = await asyncio.open_unix_connection(path, limit=LINE_LIMIT)
+    try:
+        writer.write(_encode({"op": "read_once", "timeout": timeout}))
+        response = json.loads(await asyncio.wait_for(reader.readline(), timeout + 5.0))
+    finally:
+        writer.close()
+    return response["status"], response["body"]
@@ -0,0 +1,65 @@
+"""
+Shared on-disk asset cache in SQLite (WAL mode), so API worker processes
+reuse each other's Blockfrost asset lookups. Each row holds the JSON body
+(null for unknown assets) and its wall-clock fetch time, since monotonic
+clocks are not comparable across processes.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    asset_id TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    asset TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS assets_fetched_at ON assets (fetched_at);
+"""
+
+PRUNE = """
+DELETE FROM assets WHERE asset_id IN (
+    SELECT asset_id FROM assets ORDER BY fetched_at DESC LIMIT -1 OFFSET ?
+)
+"""
+
+
+class AssetStore:
+    """Asset lookups shared between processes; one connection per thread."""
+
+    def __init__(self, path: str, max_entries: int = 100_000, prune_every: int = 1000):
+        self.path = path
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._puts = 0
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit: every put is its own short transaction
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, asset_id: str):
+        """(fetched_at, asset) or None if this asset was never stored."""
+        row = self._connection().execute(
+            "SELECT fetched_at, asset FROM assets WHERE asset_id = ?", (asset_id,)
+        ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def put(self, asset_id: str, asset, fetched_at: float = None):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO assets (asset_id, fetched_at, asset) VALUES (?, ?, ?)",
+            (asset_id, fetched_at or time.time(), json.dumps(asset)),
+        )
+        self._puts += 1
+        if self._puts % self.prune_every == 0:
+            conn.execute(PRUNE, (self.max_entries,))
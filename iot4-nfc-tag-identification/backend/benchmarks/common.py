@@ -0,0 +1,49 @@
+"""
+Shared helpers for benchmarks: percentiles and machine-readable results.
+"""
+
+import json
+import math
+import time
+import platform
+import subprocess
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles in milliseconds for samples given in seconds."""
+    if not samples:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(samples)
+    result = {}
+    for p in points:
+        index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        result[f"p{p}"] = round(ordered[index] * 1000, 3)
+    result["mean"] = round(sum(ordered) / len(ordered) * 1000, 3)
+    result["count"] = len(ordered)
+    return result
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def write_results(name, results, output=None):
+    """Print results as JSON and optionally write them to `output` for later comparison."""
+    document = {
+        "benchmark": name,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": _git_revision(),
+        "host": {"machine": platform.machine(), "python": platform.python_version()},
+        "results": results,
+    }
+    text = json.dumps(document, indent=2)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    return document
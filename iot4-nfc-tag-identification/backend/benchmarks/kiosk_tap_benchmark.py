@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+End-to-end tap-to-result benchmark for the verification kiosk.
+
+Drives NFCScanner instances through scripted taps on simulated readers,
+verifies against the local Blockfrost stand-in, and broadcasts to N real
+WebSocket clients. Reports tap-to-broadcast and WebSocket delivery
+latency percentiles plus taps/second per reader and per host as JSON.
+
+Usage:
+    python benchmarks/kiosk_tap_benchmark.py --readers 2 --clients 20 --duration 30 --output results.json
+"""
+
+import os
+import sys
+import time
+import json
+import socket
+import asyncio
+import argparse
+import threading
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(BACKEND_DIR))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import percentiles, write_results
+
+POLICY_ID = "ab" * 28
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve_in_thread(app, port):
+    """Run a uvicorn server on its own thread/event loop; returns once it accepts requests."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def _roster(count):
+    return [
+        {
+            "student_id": str(2025000 + i),
+            "student_name": f"Student {i}",
+            "department": "Computer Science",
+            "nfc_uid": f"{0x04000000 + i:08X}",
+            "issued_at": "2025-12-04",
+        }
+        for i in range(count)
+    ]
+
+
+async def run(args):
+    # Point the backend at the stand-in before any backend module reads config
+    from blockfrost_mock import MockChain, create_app as create_mock_app
+
+    chain = MockChain(POLICY_ID, _roster(args.students))
+    mock_port = _free_port()
+    mock_server = _serve_in_thread(
+        create_mock_app(chain, latency=args.chain_latency, rate=0, seed=1), mock_port
+    )
+    os.environ["BLOCKFROST_URL"] = f"http://127.0.0.1:{mock_port}"
+    os.environ.setdefault("BLOCKFROST_PROJECT_ID", "preprodbenchmark")
+
+    import uvicorn
+    from fastapi import FastAPI
+    import websockets
+    from nfc_simulator import SimulatedPN532, SimulatedCard
+    from backend.api.nfc_scanner import NFCScanner
+    from backend.api.websocket_manager import manager
+    from backend.api.routes import router
+
+    # API with the real /ws/scan route and manager, served on this event loop
+    api = FastAPI()
+    api.include_router(router)
+    api_port = _free_port()
+    api_server = uvicorn.Server(uvicorn.Config(api, host="127.0.0.1", port=api_port, log_level="warning"))
+    api_task = asyncio.create_task(api_server.serve())
+    while not api_server.started:
+        await asyncio.sleep(0.01)
+
+    # WebSocket clients record receive times keyed by (uid, timestamp)
+    received = {}
+
+    async def client(index):
+        async with websockets.connect(f"ws://127.0.0.1:{api_port}/ws/scan") as ws:
+            async for message in ws:
+                data = json.loads(message)
+                if data.get("event") == "scan":
+                    received.setdefault((data["uid"], data["timestamp"]), []).append(time.monotonic())
+
+    clients = [asyncio.create_task(client(i)) for i in range(args.clients)]
+    while manager.connection_count < args.clients:
+        await asyncio.sleep(0.01)
+
+    # One simulated reader + scanner per kiosk reader
+    students = _roster(args.students)
+    broadcast_at = {}
+    taps_per_reader = {}
+    scanners = []
+    for r in range(args.readers):
+        cards = []
+        for i in range(r, args.students, args.readers):
+            card = SimulatedCard(students[i]["nfc_uid"])
+            card.load_json({
+                "p": POLICY_ID,
+                "a": f"STU{students[i]['student_id']}".encode().hex(),
+                "s": students[i]["student_id"],
+            })
+            cards.append(card)
+        reader = SimulatedPN532(
+            taps=[(card, args.dwell, args.gap) for card in cards],
+            loop=True,
+            failure_rate={"read": args.read_failure_rate},
+            seed=r,
+        )
+        scanner = NFCScanner()
+        scanner.pn532 = reader
+        taps_per_reader[r] = []
+
+        def make_callback(reader=reader, r=r):
+            async def callback(result):
+                now = time.monotonic()
+                key = (result["uid"], result["timestamp"])
+                broadcast_at[key] = now
+                taps_per_reader[r].append(now - reader.arrived_at)
+                await manager.broadcast(result)
+            return callback
+
+        scanner.set_broadcast_callback(make_callback())
+        scanners.append(scanner)
+
+    started = time.monotonic()
+    tasks = [asyncio.create_task(s.scan_loop()) for s in scanners]
+    await asyncio.sleep(args.duration)
+    elapsed = time.monotonic() - started
+    for s in scanners:
+        s.stop()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0.2)
+
+    for task in clients:
+        task.cancel()
+    api_server.should_exit = True
+    await api_task
+    mock_server.should_exit = True
+
+    delivery = [
+        t - broadcast_at[key]
+        for key, times in received.items() if key in broadcast_at
+        for t in times
+    ]
+    all_taps = [lat for lats in taps_per_reader.values() for lat in lats]
+    return {
+        "readers": [
+            {
+                "reader": r,
+                "taps": len(lats),
+                "taps_per_second": round(len(lats) / elapsed, 3),
+                "tap_to_broadcast_ms": percentiles(lats),
+            }
+            for r, lats in taps_per_reader.items()
+        ],
+        "host": {
+            "taps": len(all_taps),
+            "taps_per_second": round(len(all_taps) / elapsed, 3),
+            "tap_to_broadcast_ms": percentiles(all_taps),
+        },
+        "websocket": {
+            "clients": args.clients,
+            "deliveries": len(delivery),
+            "delivery_ms": percentiles(delivery),
+        },
+        "blockfrost": {"requests": chain.requests, "rejected": chain.rejected},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kiosk tap-to-result benchmark")
+    parser.add_argument("--readers", type=int, default=1, help="Simulated readers (one scanner each)")
+    parser.add_argument("--clients", type=int, default=10, help="Connected WebSocket clients")
+    parser.add_argument("--students", type=int, default=200, help="Roster size (distinct cards)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run")
+    parser.add_argument("--dwell", type=float, default=0.5, help="Seconds each card stays on the reader")
+    parser.add_argument("--gap", type=float, default=0.2, help="Seconds between taps")
+    parser.add_argument("--chain-latency", type=float, default=0.05, help="Stand-in Blockfrost latency (s)")
+    parser.add_argument("--read-failure-rate", type=float, default=0.0, help="Injected block read failure rate")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    results["config"] = vars(args)
+    write_results("kiosk_tap", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Per-block MIFARE Classic read latency, before and after batching.
+
+"per_block" authenticates every block and uses the driver's status polling;
+"batched" authenticates once per sector and polls with NFC_POLL_INTERVAL.
+Both run at the same SPI clock, so their ratio is the gain from batching
+alone. With --driver pn532, "original" is the read path as it was before
+batching: per-block auth at the driver's default 100 kHz clock. Modes are
+interleaved run by run after --warmup discarded reads, so card settling and
+cold caches don't land on one mode. Each run times read_json_from_nfc on an
+already detected card and divides by the blocks read. The simulator models
+command latency only, so it shows the saved authentications but not the SPI
+polling and clock gains.
+
+Usage:
+    python benchmarks/nfc_read_benchmark.py --runs 50 --bytes 200 --output nfc_read.json
+    python benchmarks/nfc_read_benchmark.py --driver pn532 --baudrate 1000000 --baudrate 4000000
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import percentiles, write_results
+
+# Mode -> (batched, SPI clock; None = the clock being measured)
+MODES = {"per_block": (False, None), "batched": (True, None)}
+# adafruit_pn532's SPIDevice default clock, used by the original read path
+DRIVER_BAUDRATE = 100000
+
+
+def _simulated_reader(record_bytes):
+    from nfc_simulator import SimulatedPN532, SimulatedCard
+
+    card = SimulatedCard("04A2B3C4")
+    # Pad the student record to the requested size
+    record = {"p": "ab" * 28, "a": "53545544454e54", "s": "2025001"}
+    record["x"] = "0" * max(0, record_bytes - len(str(record).encode()) - 8)
+    card.load_json(record)
+    reader = SimulatedPN532()
+    reader.place(card)
+    return reader
+
+
+def _read(pn532, batched):
+    """One timed read: (seconds, blocks read, authentications)."""
+    import nfc
+
+    card = nfc.detect_card(pn532, timeout=1.0)
+    if card is None:
+        raise RuntimeError("No card on the reader")
+    before = dict(nfc.reader_stats)
+    started = time.perf_counter()
+    data = nfc.read_json_from_nfc(pn532, num_blocks=16, card=card, batched=batched)
+    elapsed = time.perf_counter() - started
+    if data is None:
+        raise RuntimeError("Card read failed")
+    return elapsed, nfc.reader_stats["read"] - before["read"], nfc.reader_stats["auth"] - before["auth"]
+
+
+def _set_baudrate(pn532, baudrate):
+    if baudrate and hasattr(pn532, "_spi"):
+        pn532._spi.baudrate = baudrate
+
+
+def _compare(pn532, runs, warmup, modes, baudrate=None):
+    samples = {mode: {"reads": [], "per_block": [], "auths": []} for mode in modes}
+    for run in range(warmup + runs):
+        for mode, (batched, mode_baudrate) in modes.items():
+            _set_baudrate(pn532, mode_baudrate or baudrate)
+            elapsed, blocks, auths = _read(pn532, batched)
+            if run < warmup:
+                continue
+            samples[mode]["reads"].append(elapsed)
+            samples[mode]["per_block"].append(elapsed / max(1, blocks))
+            samples[mode]["auths"].append(auths)
+            samples[mode]["blocks"] = blocks
+    _set_baudrate(pn532, baudrate)
+
+    results = {
+        mode: {
+            "read_ms": percentiles(sample["reads"]),
+            "per_block_ms": percentiles(sample["per_block"]),
+            "blocks_per_read": sample.get("blocks"),
+            "auths_per_read": sum(sample["auths"]) / len(sample["auths"]),
+        }
+        for mode, sample in samples.items()
+    }
+    after = results["batched"]["per_block_ms"]["p50"]
+    for mode in results.keys() - {"batched"}:
+        before = results[mode]["per_block_ms"]["p50"]
+        results[f"{mode}_p50_speedup"] = round(before / after, 2) if after else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MIFARE per-block read microbenchmark")
+    parser.add_argument("--driver", choices=["sim", "pn532"], default="sim", help="Reader driver")
+    parser.add_argument("--runs", type=int, default=50, help="Reads per mode")
+    parser.add_argument("--warmup", type=int, default=3, help="Discarded reads per mode before timing")
+    parser.add_argument("--bytes", type=int, default=200, help="Simulated record size (sim only)")
+    parser.add_argument("--baudrate", type=int, action="append", help="SPI clock to measure (pn532, repeatable)")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    import nfc
+
+    results = {}
+    # The reader functions print every card they see
+    with contextlib.redirect_stdout(io.StringIO()):
+        if args.driver == "sim":
+            results["sim"] = _compare(_simulated_reader(args.bytes), args.runs, args.warmup, MODES)
+        else:
+            pn532 = nfc.init_pn532("pn532")
+            modes = dict(MODES, original=(False, DRIVER_BAUDRATE))
+            for baudrate in args.baudrate or [nfc.NFC_SPI_BAUDRATE]:
+                results[f"{baudrate}Hz"] = _compare(pn532, args.runs, args.warmup, modes, baudrate)
+
+    results["config"] = vars(args)
+    write_results("nfc_read", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the CLI tools and the kiosk API.
+
+Each target is loaded in a fresh interpreter (module top level only, no
+main()), timed end to end, and profiled once with -X importtime to list the
+slowest imports. Targets: run.py, the API app uvicorn loads from run.py,
+verify_student.py and mint_student.py.
+
+Usage:
+    python benchmarks/startup_benchmark.py --runs 10 --target-ms 1000 --output startup.json
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import percentiles, write_results
+
+# name -> code run by a fresh interpreter from the backend directory
+TARGETS = {
+    "run.py": "import runpy; runpy.run_path('run.py', run_name='startup')",
+    "api": "import sys; sys.path.insert(0, '..'); import backend.api.main",
+    "verify_student.py": "import runpy; runpy.run_path('verify_student.py', run_name='startup')",
+    "mint_student.py": "import runpy; runpy.run_path('mint_student.py', run_name='startup')",
+}
+
+
+def _run(code, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", code]
+    started = time.perf_counter()
+    proc = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed")
+    return elapsed, proc.stderr
+
+
+def slowest_imports(importtime_output, top=10):
+    """Parse -X importtime output into the top-level imports with the largest cumulative time."""
+    entries = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if not fields[0].strip().isdigit():
+            continue  # header row
+        cumulative, name = int(fields[1]), fields[2]
+        # Top-level imports are indented by a single space
+        if name.startswith(" ") and not name.startswith("  "):
+            entries.append((cumulative, name.strip()))
+    entries.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": round(us / 1000, 3)} for us, name in entries[:top]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI/API cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per target")
+    parser.add_argument("--target-ms", type=float, default=1000.0, help="Cold-start budget (p95)")
+    parser.add_argument("--only", action="append", choices=sorted(TARGETS), help="Benchmark only these targets")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    baseline = [_run("pass")[0] for _ in range(args.runs)]
+    results = {"interpreter_ms": percentiles(baseline), "targets": {}}
+
+    for name in args.only or TARGETS:
+        code = TARGETS[name]
+        try:
+            samples = [_run(code)[0] for _ in range(args.runs)]
+            _, profile = _run(code, importtime=True)
+        except RuntimeError as e:
+            results["targets"][name] = {"error": str(e)}
+            continue
+        startup = percentiles(samples)
+        results["targets"][name] = {
+            "startup_ms": startup,
+            "within_target": startup["p95"] <= args.target_ms,
+            "slowest_imports": slowest_imports(profile),
+        }
+
+    results["config"] = vars(args)
+    write_results("startup", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
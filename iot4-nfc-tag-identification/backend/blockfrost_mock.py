@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Local Blockfrost stand-in for offline benchmarking.
+Serves the endpoints used by cardano.py / pycardano from an in-memory roster
+of student assets, with configurable latency, rate limits and error rates.
+
+Usage:
+    python blockfrost_mock.py --roster roster.json --port 8090 --latency 0.05 --rate 10
+    BLOCKFROST_URL=http://127.0.0.1:8090 python run.py
+
+Roster format:
+    {"policy_id": "<hex>", "students": [{"student_id": "2025001", "student_name": "...",
+      "department": "...", "nfc_uid": "04A2B3C4", "issued_at": "2025-12-04", "burned": false}]}
+"""
+
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+import threading
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+DEFAULT_POLICY_ID = "00" * 28
+DEFAULT_LOVELACE = 10_000 * 1_000_000
+
+PROTOCOL_PARAMS = {
+    "epoch": 200, "min_fee_a": 44, "min_fee_b": 155381, "max_block_size": 90112,
+    "max_tx_size": 16384, "max_block_header_size": 1100, "key_deposit": "2000000",
+    "pool_deposit": "500000000", "e_max": 18, "n_opt": 500, "a0": 0.3, "rho": 0.003,
+    "tau": 0.2, "decentralisation_param": 0, "extra_entropy": None,
+    "protocol_major_ver": 9, "protocol_minor_ver": 0, "min_utxo": "4310",
+    "min_pool_cost": "170000000", "nonce": "00" * 32, "price_mem": 0.0577,
+    "price_step": 0.0000721, "max_tx_ex_mem": "14000000", "max_tx_ex_steps": "10000000000",
+    "max_block_ex_mem": "62000000", "max_block_ex_steps": "20000000000",
+    "max_val_size": "5000", "collateral_percent": 150, "max_collateral_inputs": 3,
+    "coins_per_utxo_size": "4310", "coins_per_utxo_word": "4310", "cost_models": {},
+    "min_fee_ref_script_cost_per_byte": 15,
+}
+
+GENESIS = {
+    "active_slots_coefficient": 0.05, "update_quorum": 5,
+    "max_lovelace_supply": "45000000000000000", "network_magic": 1,
+    "epoch_length": 432000, "system_start": 1654041600, "slots_per_kes_period": 129600,
+    "slot_length": 1, "max_kes_evolutions": 62, "security_param": 2160,
+}
+
+
+def _error(status_code, error, message):
+    return JSONResponse(
+        status_code=status_code,
+        content={"status_code": status_code, "error": error, "message": message},
+    )
+
+
+class TokenBucket:
+    """Blockfrost-style limiter: `rate` requests/second with a `burst` allowance."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class MockChain:
+    """In-memory asset roster and request statistics."""
+
+    def __init__(self, policy_id=DEFAULT_POLICY_ID, students=None):
+        self.policy_id = policy_id
+        self.assets = {}
+        self.submitted = []
+        self.requests = 0
+        self.rejected = 0
+        for student in students or []:
+            self.add_student(student)
+
+    def add_student(self, student, policy_id=None):
+        policy_id = policy_id or self.policy_id
+        asset_name = f"STU{student['student_id']}"
+        asset_name_hex = asset_name.encode("utf-8").hex()
+        self.assets[policy_id + asset_name_hex] = {
+            "asset": policy_id + asset_name_hex,
+            "policy_id": policy_id,
+            "asset_name": asset_name_hex,
+            "fingerprint": "asset1" + hashlib.blake2b(bytes.fromhex(policy_id + asset_name_hex), digest_size=19).hexdigest(),
+            "quantity": "0" if student.get("burned") else "1",
+            "initial_mint_tx_hash": hashlib.blake2b(asset_name.encode(), digest_size=32).hexdigest(),
+            "mint_or_burn_count": 2 if student.get("burned") else 1,
+            "onchain_metadata": {
+                "name": f"Student: {student.get('student_name', '')}",
+                "student_id": student["student_id"],
+                "student_name": student.get("student_name", ""),
+                "department": student.get("department", ""),
+                "nfc_uid": student.get("nfc_uid", ""),
+                "issued_at": student.get("issued_at", ""),
+                "issuer": "Student ID System",
+            },
+            "onchain_metadata_standard": "CIP25v1",
+            "metadata": None,
+        }
+        return policy_id + asset_name_hex
+
+    def record_submission(self, cbor):
+        """Store a submitted tx; register CIP-25 minted student assets when pycardano is available."""
+        tx_hash = hashlib.blake2b(cbor, digest_size=32).hexdigest()
+        self.submitted.append(tx_hash)
+        try:
+            from pycardano import Transaction
+            tx = Transaction.from_cbor(cbor)
+            metadata = tx.auxiliary_data.data.metadata[721]
+            for policy_id, assets in metadata.items():
+                for info in assets.values():
+                    self.add_student(dict(info), policy_id=policy_id)
+        except Exception:
+            pass
+        return tx_hash
+
+
+def create_app(chain=None, latency=0.0, jitter=0.0, rate=10.0, burst=500, error_rate=0.0, seed=None):
+    """Build the stand-in app. Routes mirror Blockfrost's /v0 API."""
+    chain = chain or MockChain()
+    bucket = TokenBucket(rate, burst) if rate else None
+    rng = random.Random(seed)
+    app = FastAPI(title="Blockfrost stand-in")
+    app.state.chain = chain
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        chain.requests += 1
+        if latency or jitter:
+            await asyncio.sleep(latency + rng.uniform(0, jitter))
+        if bucket and not bucket.take():
+            chain.rejected += 1
+            return _error(429, "Project Over Limit", "Usage is over limit.")
+        if error_rate and rng.random() < error_rate:
+            return _error(500, "Internal Server Error", "Simulated failure.")
+        return await call_next(request)
+
+    @app.get("/v0/health")
+    async def health():
+        return {"is_healthy": True}
+
+    @app.get("/v0/assets/policy/{policy_id}")
+    async def assets_by_policy(policy_id: str, page: int = 1, count: int = 100):
+        matches = [
+            {"asset": a["asset"], "quantity": a["quantity"]}
+            for a in chain.assets.values() if a["policy_id"] == policy_id
+        ]
+        if not matches:
+            return _error(404, "Not Found", "The requested component has not been found.")
+        start = (page - 1) * count
+        return matches[start:start + count]
+
+    @app.get("/v0/assets/{asset_id}")
+    async def asset(asset_id: str):
+        if asset_id not in chain.assets:
+            return _error(404, "Not Found", "The requested component has not been found.")
+        return chain.assets[asset_id]
+
+    @app.get("/v0/addresses/{address}/utxos")
+    async def address_utxos(address: str, page: int = 1, count: int = 100):
+        if page > 1:
+            return []
+        return [{
+            "address": address,
+            "tx_hash": hashlib.blake2b(address.encode(), digest_size=32).hexdigest(),
+            "tx_index": 0,
+            "output_index": 0,
+            "amount": [{"unit": "lovelace", "quantity": str(DEFAULT_LOVELACE)}],
+            "block": "00" * 32,
+            "data_hash": None,
+            "inline_datum": None,
+            "reference_script_hash": None,
+        }]
+
+    @app.get("/v0/epochs/latest/parameters")
+    async def protocol_parameters():
+        return PROTOCOL_PARAMS
+
+    @app.get("/v0/epochs/latest")
+    async def epoch_latest():
+        now = int(time.time())
+        return {"epoch": PROTOCOL_PARAMS["epoch"], "start_time": now - 3600, "end_time": now + 428400}
+
+    @app.get("/v0/genesis")
+    async def genesis():
+        return GENESIS
+
+    @app.get("/v0/blocks/latest")
+    async def block_latest():
+        slot = int(time.time()) - GENESIS["system_start"]
+        return {"slot": slot, "height": slot // 20, "time": int(time.time()),
+                "hash": "00" * 32, "epoch": PROTOCOL_PARAMS["epoch"]}
+
+    @app.post("/v0/tx/submit")
+    async def submit(request: Request):
+        return chain.record_submission(await request.body())
+
+    @app.get("/_mock/stats")
+    async def stats():
+        return {
+            "requests": chain.requests,
+            "rejected": chain.rejected,
+            "assets": len(chain.assets),
+            "submitted": len(chain.submitted),
+        }
+
+    return app
+
+
+def load_roster(path):
+    with open(path) as f:
+        roster = json.load(f)
+    return MockChain(roster.get("policy_id", DEFAULT_POLICY_ID), roster.get("students", []))
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local Blockfrost stand-in")
+    parser.add_argument("--roster", help="JSON roster of student assets")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base latency per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency (s)")
+    parser.add_argument("--rate", type=float, default=10.0, help="Requests/second (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=500, help="Burst allowance")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument("--seed", type=int, help="Random seed for jitter and errors")
+    args = parser.parse_args()
+
+    chain = load_roster(args.roster) if args.roster else MockChain()
+    app = create_app(chain, args.latency, args.jitter, args.rate, args.burst, args.error_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,111 @@
+"""
+Process-wide Blockfrost request scheduler.
+A token bucket matching the project's plan limits (requests/second, burst and
+daily quota) hands out request slots by priority, so tap verifications go
+ahead of background syncs and callers wait or get RateLimited instead of 429s.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timezone
+
+# Priorities, lowest value served first
+INTERACTIVE = 0   # tap verification
+BACKGROUND = 1    # revocation sync, health probes, on-chain confirmations
+BULK = 2          # batch jobs and polling
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background", BULK: "bulk"}
+
+
+class RateLimited(Exception):
+    """No Blockfrost request slot became available within the caller's deadline."""
+
+
+def _utc_day():
+    return datetime.now(timezone.utc).date()
+
+
+class RequestScheduler:
+    """
+    Token bucket with a priority queue of waiting callers.
+    Non-interactive requests leave `reserve` tokens in the bucket and stop at
+    `background_share` of the daily quota, so taps always have headroom.
+    """
+
+    def __init__(self, rate=10.0, burst=500, daily_limit=50000, reserve=None, background_share=0.9):
+        self.rate = rate
+        self.burst = burst
+        self.daily_limit = daily_limit
+        self.reserve = min(burst - 1, rate) if reserve is None else reserve
+        self.background_share = background_share
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.day = _utc_day()
+        self.used_today = 0
+        self.stats = {"granted": 0, "rate_limited": 0, "backoffs": 0, "wait_seconds": 0.0}
+        self._waiters = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        today = _utc_day()
+        if today != self.day:
+            self.day, self.used_today = today, 0
+
+    def _available(self, priority, now):
+        """Seconds until this priority may take a token (0 = now, None = not today)."""
+        floor = 0 if priority == INTERACTIVE else self.reserve
+        if self.daily_limit:
+            limit = self.daily_limit if priority == INTERACTIVE else self.daily_limit * self.background_share
+            if self.used_today >= limit:
+                return None
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= floor + 1:
+            return 0.0
+        return (floor + 1 - self.tokens) / self.rate
+
+    def acquire(self, priority=INTERACTIVE, timeout=10.0):
+        """Block until a request slot is granted; raises RateLimited after `timeout` seconds."""
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._cond:
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._available(priority, now) if self._waiters[0] == entry else 0.05
+                    if wait == 0.0:
+                        self.tokens -= 1
+                        self.used_today += 1
+                        self.stats["granted"] += 1
+                        self.stats["wait_seconds"] += now - started
+                        return
+                    if wait is None or now + min(wait, 0.05) > deadline:
+                        self.stats["rate_limited"] += 1
+                        reason = "daily quota reached" if wait is None else f"retry in {wait:.2f}s"
+                        raise RateLimited(f"Blockfrost request budget exhausted ({reason})")
+                    self._cond.wait(min(wait, deadline - now))
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def backoff(self, seconds=1.0):
+        """Blockfrost answered 429 (quota shared elsewhere): drain the bucket and pause."""
+        with self._cond:
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.stats["backoffs"] += 1
+            self._cond.notify_all()
+
+    @property
+    def queued(self):
+        return len(self._waiters)
@@ -0,0 +1,30 @@
+"""
+Compact Bloom filter for O(1) negative membership checks.
+"""
+
+import math
+import hashlib
+
+
+class BloomFilter:
+    """Bloom filter over strings using double hashing of one blake2b digest."""
+
+    def __init__(self, capacity=1024, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        """False means definitely absent; True means possibly present."""
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
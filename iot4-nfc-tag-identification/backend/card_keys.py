@@ -0,0 +1,144 @@
+"""
+UID -> MIFARE key cache for cards secured with per-card diversified keys.
+Registration derives each card's key from NFC_MASTER_KEY and adds it here;
+the kiosk loads the file at start, so a tap costs a dict lookup instead of
+an HMAC. Unknown UIDs are derived per tap but not kept, so they cannot push
+registered cards out; UIDs that turn out to still use the factory key are
+remembered so their next tap skips the failing authentication.
+"""
+
+import fcntl
+import json
+import os
+import threading
+from collections import OrderedDict
+from config import NFC_MASTER_KEY, NFC_KEY_CACHE_PATH, NFC_KEY_CACHE_SIZE
+from nfc import DEFAULT_KEY, CARD_MIFARE_CLASSIC, diversify_key, read_json_from_nfc, wait_for_target
+
+# Block counters of the nfc module doing the reads. The API imports this module as
+# backend.card_keys but nfc as backend.nfc, a separate copy, so /metrics reads them here.
+from nfc import reader_stats
+
+
+def _uid_hex(uid):
+    return uid.upper() if isinstance(uid, str) else bytes(uid).hex().upper()
+
+
+class KeyCache:
+    """Bounded LRU of UID -> diversified key, persisted to a JSON file readable only by its owner."""
+
+    def __init__(self, path=NFC_KEY_CACHE_PATH, max_entries=NFC_KEY_CACHE_SIZE, master_key=NFC_MASTER_KEY):
+        self.path = path
+        self.max_entries = max_entries
+        self.master_key = bytes.fromhex(master_key) if master_key else None
+        self._lock = threading.Lock()
+        self._keys = OrderedDict()
+        self._factory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.master_key is not None
+
+    def _remember(self, uid_hex, key):
+        with self._lock:
+            self._keys[uid_hex] = key
+            self._keys.move_to_end(uid_hex)
+            while len(self._keys) > self.max_entries:
+                self._keys.popitem(last=False)
+
+    def _read_file(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def load(self):
+        """Fill the cache from the key file (most recently registered cards last). Returns the count."""
+        if not self.enabled:
+            return 0
+        for uid_hex, key_hex in list(self._read_file().items())[-self.max_entries:]:
+            self._remember(uid_hex, bytes.fromhex(key_hex))
+        return len(self._keys)
+
+    def save(self, uid_hex, key):
+        """
+        Add one entry to the key file atomically. Merges with what is on disk
+        under an exclusive lock, so registration stations sharing the file (or
+        one that never loaded it) keep each other's cards.
+        """
+        if not self.path:
+            return
+        with open(f"{self.path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = self._read_file()
+            entries.pop(uid_hex, None)
+            entries[uid_hex] = key.hex()
+            entries = dict(list(entries.items())[-self.max_entries:])
+            tmp_path = f"{self.path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+
+    def add(self, uid):
+        """Derive and store the key for a newly secured card; returns it."""
+        uid_hex = _uid_hex(uid)
+        key = self.derive(uid_hex)
+        self._remember(uid_hex, key)
+        self.save(uid_hex, key)
+        return key
+
+    def keys_for(self, uid):
+        """(key, fallback_keys) to authenticate this card with, most likely first."""
+        if not self.enabled:
+            return DEFAULT_KEY, ()
+        uid_hex = _uid_hex(uid)
+        with self._lock:
+            key = self._keys.get(uid_hex)
+            if key is not None:
+                self._keys.move_to_end(uid_hex)
+                self.hits += 1
+                return key, (DEFAULT_KEY,)
+            if uid_hex in self._factory:
+                self._factory.move_to_end(uid_hex)
+                self.hits += 1
+                return DEFAULT_KEY, (self.derive(uid_hex),)
+            self.misses += 1
+        return self.derive(uid_hex), (DEFAULT_KEY,)
+
+    def derive(self, uid):
+        """The card's diversified key, without caching it."""
+        return diversify_key(bytes.fromhex(_uid_hex(uid)), self.master_key)
+
+    def accepted(self, uid, key):
+        """Record which key a card authenticated with; only factory-key UIDs are kept."""
+        uid_hex = _uid_hex(uid)
+        with self._lock:
+            if key != DEFAULT_KEY:
+                self._factory.pop(uid_hex, None)
+                return
+            self._factory[uid_hex] = True
+            self._factory.move_to_end(uid_hex)
+            while len(self._factory) > self.max_entries:
+                self._factory.popitem(last=False)
+
+
+# Singleton instance
+key_cache = KeyCache()
+
+
+def read_card_json(pn532, card=None, **kwargs):
+    """
+    read_json_from_nfc with the card's own key: cached or derived for secured
+    MIFARE Classic cards, with the factory key for cards not yet secured.
+    Waits for a card unless one is given.
+    """
+    if card is None:
+        card = wait_for_target(pn532)
+    if card.kind != CARD_MIFARE_CLASSIC:
+        return read_json_from_nfc(pn532, card=card, **kwargs)
+    key, fallback_keys = key_cache.keys_for(card.uid)
+    return read_json_from_nfc(pn532, key=key, card=card, fallback_keys=fallback_keys,
+                              on_key=lambda used: key_cache.accepted(card.uid, used), **kwargs)
@@ -0,0 +1,73 @@
+"""
+Signed student card payloads for offline verification.
+The policy key signs (policy, asset, student_id, nfc_uid) at registration;
+the kiosk checks the Ed25519 signature locally instead of querying Blockfrost.
+"""
+
+import base64
+
+# Domain separator so card signatures can't be replayed as other messages
+SIGNATURE_PREFIX = b"STUCARD1"
+
+_cached_verifier = None
+
+
+def _field(data):
+    return len(data).to_bytes(1, "big") + data
+
+
+def signing_message(policy_id, asset_name_hex, student_id, nfc_uid):
+    """Canonical bytes covered by the card signature."""
+    return (
+        SIGNATURE_PREFIX
+        + _field(bytes.fromhex(policy_id))
+        + _field(bytes.fromhex(asset_name_hex))
+        + _field(str(student_id).encode("utf-8"))
+        + _field(bytes.fromhex(nfc_uid))
+    )
+
+
+def sign_card(policy_skey, policy_id, asset_name_hex, student_id, nfc_uid):
+    """Sign card fields with the policy signing key. Returns compact base64url (86 chars)."""
+    message = signing_message(policy_id, asset_name_hex, student_id, nfc_uid)
+    signature = policy_skey.sign(message)
+    return base64.urlsafe_b64encode(signature).rstrip(b"=").decode("ascii")
+
+
+def load_verifier():
+    """
+    Derive the policy verification key and policy ID from the mnemonic (slow).
+    Called once at API startup, off the event loop.
+    """
+    global _cached_verifier
+    if _cached_verifier is None:
+        from nacl.signing import VerifyKey
+        from backend.cardano import load_policy_key
+        _, policy_vkey, _, policy_id = load_policy_key()
+        _cached_verifier = (VerifyKey(policy_vkey.payload), policy_id.payload.hex())
+    return _cached_verifier
+
+
+def verify_card(nfc_data, nfc_uid):
+    """
+    Check the card signature ("g") against our policy key.
+    Returns True only if the card names our policy and the signature covers
+    this card's UID, so signed payloads can't be copied to another card.
+    False until load_verifier() has run, so the card is verified online.
+    """
+    signature = nfc_data.get("g")
+    if not signature or _cached_verifier is None:
+        return False
+
+    verify_key, policy_id = _cached_verifier
+    if nfc_data.get("p") != policy_id:
+        return False
+
+    from nacl.exceptions import BadSignatureError
+
+    try:
+        message = signing_message(nfc_data["p"], nfc_data["a"], nfc_data["s"], nfc_uid)
+        verify_key.verify(message, base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4)))
+        return True
+    except (BadSignatureError, ValueError, KeyError):
+        return False
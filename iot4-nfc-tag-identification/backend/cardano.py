@@ -1,39 +1,62 @@
-import requests
-from pycardano import (
-    BlockFrostChainContext,
-    PaymentSigningKey,
-    PaymentVerificationKey,
-    Address,
-    Network,
-    HDWallet,
-    ScriptAll,
-    ScriptPubkey,
-)
+"""
+Cardano helpers: wallet/policy keys, chain context and Blockfrost queries.
+pycardano and requests are imported on first use, so importing this module
+stays cheap for paths that never touch the chain.
+"""
+
+import threading
+import time
+from collections import OrderedDict
 from config import (
     BLOCKFROST_PROJECT_ID,
     CARDANO_NETWORK,
     MNEMONIC,
+    BLOCKFROST_RATE,
+    BLOCKFROST_BURST,
+    BLOCKFROST_DAILY_LIMIT,
+    ASSET_CACHE_SIZE,
+    ASSET_CACHE_PATH,
+    API_WORKERS,
     get_blockfrost_url,
 )
+from bloom_filter import BloomFilter
+from asset_store import AssetStore
+from blockfrost_scheduler import RequestScheduler, INTERACTIVE, BACKGROUND
+
+# One scheduler per process; all Blockfrost GETs below take a slot from it.
+# API workers each get an equal share of the project's limits.
+scheduler = RequestScheduler(
+    BLOCKFROST_RATE / API_WORKERS,
+    max(1, BLOCKFROST_BURST // API_WORKERS),
+    BLOCKFROST_DAILY_LIMIT // API_WORKERS,
+)
 
 _cached_hdwallet = None
 
+# Callables invoked as observer(endpoint, status_code, seconds) after each
+# Blockfrost request made here; status_code is 0 when the request failed to connect
+request_observers = []
+
 def _get_hdwallet():
     global _cached_hdwallet
     if _cached_hdwallet is None:
+        from pycardano import HDWallet
         _cached_hdwallet = HDWallet.from_mnemonic(MNEMONIC)
     return _cached_hdwallet
 
 def _get_network():
+    from pycardano import Network
     return Network.TESTNET if CARDANO_NETWORK != "mainnet" else Network.MAINNET
 
 def init_context():
+    from pycardano import BlockFrostChainContext
     return BlockFrostChainContext(
         project_id=BLOCKFROST_PROJECT_ID,
         base_url=get_blockfrost_url(),
     )
 
 def load_wallet():
+    from pycardano import PaymentSigningKey, PaymentVerificationKey, Address
     hdwallet = _get_hdwallet()
     payment_key = hdwallet.derive_from_path("m/1852'/1815'/0'/0/0")
     payment_skey = PaymentSigningKey.from_primitive(payment_key.xprivate_key[:32])
@@ -42,6 +65,7 @@ def load_wallet():
     return payment_skey, payment_vkey, address
 
 def load_policy_key():
+    from pycardano import PaymentSigningKey, PaymentVerificationKey, ScriptAll, ScriptPubkey
     hdwallet = _get_hdwallet()
     policy_key = hdwallet.derive_from_path("m/1852'/1815'/0'/2/0")
     policy_skey = PaymentSigningKey.from_primitive(policy_key.xprivate_key[:32])
@@ -58,11 +82,40 @@ def get_utxos(address_str):
     context = init_context()
     return context.utxos(address_str)
 
-def query_asset(policy_id, asset_name_hex):
-    asset_id = f"{policy_id}{asset_name_hex}"
-    url = f"{get_blockfrost_url()}/v0/assets/{asset_id}"
+def _request(endpoint, url, headers, timeout, **kwargs):
+    import requests
+    status = 0
+    started = time.perf_counter()
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout, **kwargs)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        for observer in request_observers:
+            observer(endpoint, status, elapsed)
+
+def blockfrost_get(endpoint, path, timeout=30, priority=INTERACTIVE, max_wait=10.0, **kwargs):
+    """
+    GET a Blockfrost /v0 path through the request scheduler.
+    Waits up to `max_wait` seconds for a slot (raises RateLimited after that);
+    a 429 pauses the scheduler and the request is retried within the same budget.
+    Status and latency are reported to request_observers.
+    """
+    url = f"{get_blockfrost_url()}/v0/{path}"
     headers = {"project_id": BLOCKFROST_PROJECT_ID}
-    response = requests.get(url, headers=headers, timeout=30)
+    deadline = time.monotonic() + max_wait
+    while True:
+        scheduler.acquire(priority, timeout=max(0.0, deadline - time.monotonic()))
+        response = _request(endpoint, url, headers, timeout, **kwargs)
+        if response.status_code != 429:
+            return response
+        retry_after = response.headers.get("Retry-After", "1")
+        scheduler.backoff(float(retry_after) if retry_after.isdigit() else 1.0)
+
+def query_asset(policy_id, asset_name_hex, priority=INTERACTIVE, max_wait=10.0):
+    asset_id = f"{policy_id}{asset_name_hex}"
+    response = blockfrost_get("assets", f"assets/{asset_id}", priority=priority, max_wait=max_wait)
     if response.status_code == 200:
         return response.json()
     elif response.status_code == 404:
@@ -70,10 +123,90 @@ def query_asset(policy_id, asset_name_hex):
     else:
         response.raise_for_status()
 
+class AssetCache:
+    """
+    Bounded LRU of asset lookups, including misses (None for unknown assets).
+    Readers pass the maximum age they accept, so one cache serves callers
+    with different freshness needs. With a `store` (AssetStore), lookups
+    missing from memory are read from, and every put is written to, a cache
+    file shared with other worker processes.
+    """
+
+    def __init__(self, max_entries=10000, store=None):
+        self.max_entries = max_entries
+        self.store = store
+        self._lock = threading.Lock()
+        # asset_id -> (fetched_at, asset); wall-clock time so entries compare with the shared store
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, asset_id, max_age):
+        """Fresh (fetched_at, asset) from memory, then from the shared store; None if neither has one."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(asset_id)
+            if entry and now - entry[0] <= max_age:
+                self._entries.move_to_end(asset_id)
+                return entry
+        if self.store is None:
+            return None
+        entry = self.store.get(asset_id)
+        if entry and now - entry[0] <= max_age:
+            self._remember(asset_id, entry)
+            return entry
+        return None
+
+    def _remember(self, asset_id, entry):
+        with self._lock:
+            self._entries[asset_id] = entry
+            self._entries.move_to_end(asset_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, asset_id, max_age):
+        """(True, asset) if a lookup no older than max_age seconds is cached."""
+        entry = self._lookup(asset_id, max_age)
+        if entry:
+            self.hits += 1
+            return True, entry[1]
+        self.misses += 1
+        return False, None
+
+    def fresh(self, asset_id, max_age):
+        """Whether get() would hit, without counting a lookup."""
+        return self._lookup(asset_id, max_age) is not None
+
+    def put(self, asset_id, asset):
+        entry = (time.time(), asset)
+        self._remember(asset_id, entry)
+        if self.store is not None:
+            self.store.put(asset_id, asset, fetched_at=entry[0])
+
+    def __len__(self):
+        return len(self._entries)
+
+
+asset_cache = AssetCache(ASSET_CACHE_SIZE, AssetStore(ASSET_CACHE_PATH) if ASSET_CACHE_PATH else None)
+
+
+def get_asset(policy_id, asset_name_hex, priority=INTERACTIVE, max_age=0.0, max_wait=10.0):
+    """
+    query_asset() through the asset cache. max_age=0 always asks Blockfrost
+    (the result still refreshes the cache); errors are never cached.
+    """
+    asset_id = f"{policy_id}{asset_name_hex}"
+    if max_age > 0:
+        hit, asset = asset_cache.get(asset_id, max_age)
+        if hit:
+            return asset
+    asset = query_asset(policy_id, asset_name_hex, priority=priority, max_wait=max_wait)
+    asset_cache.put(asset_id, asset)
+    return asset
+
+
 def query_asset_by_policy(policy_id):
-    url = f"{get_blockfrost_url()}/v0/assets/policy/{policy_id}"
-    headers = {"project_id": BLOCKFROST_PROJECT_ID}
-    response = requests.get(url, headers=headers, timeout=30)
+    response = blockfrost_get("assets_policy", f"assets/policy/{policy_id}")
     if response.status_code == 200:
         return response.json()
     elif response.status_code == 404:
@@ -87,11 +220,82 @@ def get_asset_metadata(policy_id, asset_name_hex):
         return asset["onchain_metadata"]
     return None
 
-def check_connection():
+def check_connection(priority=BACKGROUND):
     try:
-        url = f"{get_blockfrost_url()}/v0/health"
-        headers = {"project_id": BLOCKFROST_PROJECT_ID}
-        response = requests.get(url, headers=headers, timeout=10)
+        response = blockfrost_get("health", "health", timeout=10, priority=priority)
         return response.status_code == 200
     except Exception:
         return False
+
+
+def query_burned_assets(policy_id):
+    """Return asset IDs under the policy whose supply has been burned to zero."""
+    burned = []
+    page = 1
+    while True:
+        response = blockfrost_get(
+            "assets_policy", f"assets/policy/{policy_id}",
+            priority=BACKGROUND, max_wait=60.0, params={"page": page},
+        )
+        if response.status_code == 404:
+            break
+        response.raise_for_status()
+        assets = response.json()
+        burned.extend(a["asset"] for a in assets if a.get("quantity") == "0")
+        if len(assets) < 100:
+            break
+        page += 1
+    return burned
+
+
+class RevocationList:
+    """
+    Locally cached set of burned/revoked asset IDs.
+    A Bloom filter answers the common "not revoked" case without touching the set.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked = set()
+        self._bloom = BloomFilter()
+        self.updated_at = None
+        # Lookups answered by the Bloom filter alone vs. all lookups
+        self.lookups = 0
+        self.fast_path = 0
+
+    def replace(self, asset_ids):
+        revoked = set(asset_ids)
+        bloom = BloomFilter(capacity=max(1024, 2 * len(revoked)))
+        for asset_id in revoked:
+            bloom.add(asset_id)
+        with self._lock:
+            self._revoked, self._bloom = revoked, bloom
+            self.updated_at = time.time()
+
+    def add(self, asset_id):
+        with self._lock:
+            self._revoked.add(asset_id)
+            self._bloom.add(asset_id)
+
+    def __contains__(self, asset_id):
+        self.lookups += 1
+        if asset_id not in self._bloom:
+            self.fast_path += 1
+            return False
+        return asset_id in self._revoked
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+revocations = RevocationList()
+
+
+def refresh_revocations(policy_id):
+    """Pull burn events for the policy into the local revocation list."""
+    revocations.replace(query_burned_assets(policy_id))
+    return len(revocations)
+
+
+def is_revoked(policy_id, asset_name_hex):
+    return f"{policy_id}{asset_name_hex}" in revocations
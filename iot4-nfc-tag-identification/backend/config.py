@@ -6,6 +6,63 @@ load_dotenv()
 BLOCKFROST_PROJECT_ID = os.getenv("BLOCKFROST_PROJECT_ID", "")
 CARDANO_NETWORK = BLOCKFROST_PROJECT_ID[:7] if BLOCKFROST_PROJECT_ID else "preprod"
 MNEMONIC = os.getenv("MNEMONIC", "")
+# Optional Blockfrost base URL override (e.g. the local stand-in in blockfrost_mock.py)
+BLOCKFROST_URL = os.getenv("BLOCKFROST_URL", "")
+# Blockfrost plan limits shared by all requests from one process (free plan defaults)
+BLOCKFROST_RATE = float(os.getenv("BLOCKFROST_RATE", "10"))
+BLOCKFROST_BURST = int(os.getenv("BLOCKFROST_BURST", "500"))
+BLOCKFROST_DAILY_LIMIT = int(os.getenv("BLOCKFROST_DAILY_LIMIT", "50000"))
+
+# NFC reader driver: "pn532" (SPI hardware) or "sim" (simulated reader for testing)
+NFC_DRIVER = os.getenv("NFC_DRIVER", "pn532")
+NFC_SIM_SCRIPT = os.getenv("NFC_SIM_SCRIPT", "")
+# PN532 SPI clock (the driver defaults to 100 kHz; the PN532 allows up to 5 MHz)
+NFC_SPI_BAUDRATE = int(os.getenv("NFC_SPI_BAUDRATE", "1000000"))
+# Seconds between PN532 status polls during batched block reads (adafruit_pn532 sleeps
+# 10 ms between polls; releases up to 2.0 also slept 20 ms before each poll)
+NFC_POLL_INTERVAL = float(os.getenv("NFC_POLL_INTERVAL", "0.0005"))
+# Seconds to wait after selecting the PN532 before its first status poll (the
+# Arduino driver waits 2 ms; poll too early and the status byte is not valid)
+NFC_READY_DELAY = float(os.getenv("NFC_READY_DELAY", "0.002"))
+# Hex master key for per-card MIFARE keys ("" keeps the factory key on every card)
+NFC_MASTER_KEY = os.getenv("NFC_MASTER_KEY", "")
+# UID -> key cache written at registration and loaded by the kiosk, and its size
+NFC_KEY_CACHE_PATH = os.getenv("NFC_KEY_CACHE_PATH", "card_keys.json")
+NFC_KEY_CACHE_SIZE = int(os.getenv("NFC_KEY_CACHE_SIZE", "10000"))
+
+# Trust signed cards locally and confirm on chain in the background
+OFFLINE_VERIFY = os.getenv("OFFLINE_VERIFY", "false").lower() in ("1", "true", "yes")
+
+# Seconds between pulls of burned student NFTs into the revocation list
+REVOCATION_REFRESH_SECONDS = int(os.getenv("REVOCATION_REFRESH_SECONDS", "300"))
+
+# uvicorn worker processes for the API; one of them owns the NFC reader and
+# forwards scan events to the others over a Unix socket
+API_WORKERS = max(1, int(os.getenv("API_WORKERS", "1")))
+IPC_SOCKET_PATH = os.getenv("IPC_SOCKET_PATH", "/tmp/nfc-kiosk-events.sock")
+
+# Asset lookups kept in memory, and how old a cached one batch verification accepts
+ASSET_CACHE_SIZE = int(os.getenv("ASSET_CACHE_SIZE", "10000"))
+ASSET_CACHE_SECONDS = float(os.getenv("ASSET_CACHE_SECONDS", "300"))
+# SQLite file shared by workers for asset lookups ("" keeps them in memory only)
+ASSET_CACHE_PATH = os.getenv("ASSET_CACHE_PATH", "asset_cache.sqlite3" if API_WORKERS > 1 else "")
+
+# Concurrent Blockfrost lookups per batch verification request, and its item limit
+BATCH_VERIFY_CONCURRENCY = int(os.getenv("BATCH_VERIFY_CONCURRENCY", "8"))
+BATCH_VERIFY_MAX_ITEMS = int(os.getenv("BATCH_VERIFY_MAX_ITEMS", "10000"))
+
+# Seconds between background Blockfrost/NFC reader probes for /api/health
+HEALTH_CHECK_SECONDS = float(os.getenv("HEALTH_CHECK_SECONDS", "15"))
+
+# Append-only SQLite log of scan results ("" disables) and this kiosk's gate name
+SCAN_LOG_PATH = os.getenv("SCAN_LOG_PATH", "scan_log.sqlite3")
+KIOSK_GATE = os.getenv("KIOSK_GATE", "main")
+
+# Recent WebSocket events kept for clients reconnecting with ?since=<seq>
+WS_REPLAY_SIZE = int(os.getenv("WS_REPLAY_SIZE", "1000"))
+
+# Record per-stage timings for each scan (attached to results and histograms)
+TRACE_STAGES = os.getenv("TRACE_STAGES", "false").lower() in ("1", "true", "yes")
 
 BLOCKFROST_BASE_URL = {
     "mainnet": "https://cardano-mainnet.blockfrost.io/api",
@@ -14,6 +71,8 @@ BLOCKFROST_BASE_URL = {
 }
 
 def get_blockfrost_url():
+    if BLOCKFROST_URL:
+        return BLOCKFROST_URL.rstrip("/")
     return BLOCKFROST_BASE_URL.get(CARDANO_NETWORK, BLOCKFROST_BASE_URL["preprod"])
 
 def validate_config():
@@ -0,0 +1,392 @@
+"""
+Append-only log of verification events in SQLite (WAL mode).
+append() only enqueues; a writer thread commits queued events in batches,
+so the event loop never waits on disk. Indexes on uid, student_id and time
+keep per-card and per-student range queries fast at millions of rows.
+
+The writer also maintains rollups in the same transaction as each batch:
+per-minute tap counts by gate, per-hour latency histograms and the set of
+students seen per day, so analytics never scan raw events. Only events of
+kind "scan" are taps; other kinds (e.g. an on-chain correction of an earlier
+tap) are logged but left out of the rollups.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    uid TEXT,
+    student_id TEXT,
+    verified INTEGER NOT NULL,
+    error TEXT,
+    gate TEXT,
+    latency_ms REAL,
+    data TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'scan'
+);
+CREATE INDEX IF NOT EXISTS scans_ts ON scans (ts);
+CREATE INDEX IF NOT EXISTS scans_uid_ts ON scans (uid, ts);
+CREATE INDEX IF NOT EXISTS scans_student_ts ON scans (student_id, ts);
+CREATE TRIGGER IF NOT EXISTS scans_no_update BEFORE UPDATE ON scans
+BEGIN SELECT RAISE(ABORT, 'scan log is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS scans_no_delete BEFORE DELETE ON scans
+BEGIN SELECT RAISE(ABORT, 'scan log is append-only'); END;
+
+CREATE TABLE IF NOT EXISTS minute_buckets (
+    minute INTEGER NOT NULL,
+    gate TEXT NOT NULL,
+    taps INTEGER NOT NULL,
+    verified INTEGER NOT NULL,
+    latency_sum REAL NOT NULL,
+    latency_count INTEGER NOT NULL,
+    latency_max REAL,
+    PRIMARY KEY (minute, gate)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hour_latency (
+    hour INTEGER NOT NULL,
+    gate TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, gate, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_students (
+    day TEXT NOT NULL,
+    gate TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    PRIMARY KEY (day, gate, student_id)
+) WITHOUT ROWID;
+"""
+
+# Bumped when rollup tables change; older logs are re-aggregated on open
+ROLLUP_VERSION = 2
+
+# Latency histogram upper bounds in ms (last bucket is +Inf)
+LATENCY_BUCKETS_MS = (25, 50, 75, 100, 150, 200, 300, 400, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+UPSERT_MINUTE = """
+INSERT INTO minute_buckets (minute, gate, taps, verified, latency_sum, latency_count, latency_max)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (minute, gate) DO UPDATE SET
+    taps = taps + excluded.taps,
+    verified = verified + excluded.verified,
+    latency_sum = latency_sum + excluded.latency_sum,
+    latency_count = latency_count + excluded.latency_count,
+    latency_max = MAX(COALESCE(latency_max, excluded.latency_max), COALESCE(excluded.latency_max, latency_max))
+"""
+
+UPSERT_HOUR = """
+INSERT INTO hour_latency (hour, gate, bucket, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (hour, gate, bucket) DO UPDATE SET count = count + excluded.count
+"""
+
+INSERT_STUDENT = "INSERT OR IGNORE INTO daily_students (day, gate, student_id) VALUES (?, ?, ?)"
+
+COLUMNS = ("id", "ts", "uid", "student_id", "verified", "error", "gate", "latency_ms", "kind")
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL: commits survive a process crash; a power cut can lose the last batch
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _local_day(ts):
+    return time.strftime("%Y-%m-%d", time.localtime(ts))
+
+
+def _apply_rollups(conn, rows):
+    """Fold (ts, uid, student_id, verified, error, gate, latency_ms, kind, ...) rows into the rollup tables."""
+    minutes = {}
+    hours = Counter()
+    students = set()
+    for row in rows:
+        ts, _, student_id, verified, _, gate, latency_ms, kind = row[:8]
+        if kind != "scan":
+            continue
+        key = (int(ts // 60), gate)
+        bucket = minutes.get(key)
+        if bucket is None:
+            bucket = minutes[key] = [0, 0, 0.0, 0, None]
+        bucket[0] += 1
+        bucket[1] += verified
+        if latency_ms is not None:
+            bucket[2] += latency_ms
+            bucket[3] += 1
+            bucket[4] = latency_ms if bucket[4] is None else max(bucket[4], latency_ms)
+            hours[(int(ts // 3600), gate, bisect_left(LATENCY_BUCKETS_MS, latency_ms))] += 1
+        if verified and student_id:
+            students.add((_local_day(ts), gate, student_id))
+
+    conn.executemany(UPSERT_MINUTE, [(m, g, *b) for (m, g), b in minutes.items()])
+    conn.executemany(UPSERT_HOUR, [(*key, count) for key, count in hours.items()])
+    conn.executemany(INSERT_STUDENT, students)
+
+
+def histogram_percentile(counts, p):
+    """Upper bound (ms) of the bucket holding the p-th percentile; None past the last bound."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = p / 100 * total
+    seen = 0
+    for i, count in enumerate(counts):
+        seen += count
+        if seen >= rank:
+            return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else None
+    return None
+
+
+def _event_time(event):
+    try:
+        return datetime.fromisoformat(event["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+
+class EventLog:
+    """Batched, group-committed writer plus indexed read queries."""
+
+    def __init__(self, path, gate="", batch_size=500, flush_interval=0.05, max_queue=100_000):
+        self.path = path
+        self.gate = gate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._local = threading.local()
+
+        conn = _connect(path)
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'scans'").fetchone():
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(scans)")}
+            if "kind" not in columns:
+                conn.execute("ALTER TABLE scans ADD COLUMN kind TEXT NOT NULL DEFAULT 'scan'")
+        conn.executescript(SCHEMA)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < ROLLUP_VERSION:
+            self._rebuild_rollups(conn)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="event-log-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, event, latency_ms=None, kind="scan"):
+        """
+        Queue an event for writing. Never blocks; drops when the queue is full.
+        Only kind "scan" counts as a tap in the rollups.
+        """
+        row = (
+            _event_time(event),
+            event.get("uid"),
+            str(event["student_id"]) if event.get("student_id") is not None else None,
+            1 if event.get("verified") else 0,
+            event.get("error"),
+            event.get("gate", self.gate) or "",
+            latency_ms,
+            kind,
+            json.dumps(event),
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        while True:
+            row = self._queue.get()
+            if row is None:
+                break
+            batch = [row]
+            # Group commit: gather whatever else arrives within the flush interval
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO scans (ts, uid, student_id, verified, error, gate, latency_ms, kind, data)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        batch,
+                    )
+                    _apply_rollups(conn, batch)
+                self.written += len(batch)
+            except sqlite3.Error as e:
+                print(f"Scan log write failed ({len(batch)} events): {e}")
+            if stop:
+                break
+        conn.close()
+
+    @staticmethod
+    def _rebuild_rollups(conn, chunk=10000):
+        """Recompute rollups from raw events (log created before the current rollup version)."""
+        with conn:
+            conn.execute("DELETE FROM minute_buckets")
+            conn.execute("DELETE FROM hour_latency")
+            conn.execute("DELETE FROM daily_students")
+            cursor = conn.execute(
+                "SELECT ts, uid, student_id, verified, error, COALESCE(gate, ''), latency_ms,"
+                # Corrections logged before the kind column carry the original tap's scanned_at
+                " CASE WHEN json_extract(data, '$.scanned_at') IS NULL THEN kind ELSE 'correction' END"
+                " FROM scans ORDER BY id"
+            )
+            while True:
+                rows = cursor.fetchmany(chunk)
+                if not rows:
+                    break
+                _apply_rollups(conn, rows)
+            conn.execute(f"PRAGMA user_version = {ROLLUP_VERSION}")
+
+    def close(self, timeout=5.0):
+        """Write everything queued so far, then stop the writer."""
+        self._queue.put(None)
+        self._writer.join(timeout)
+
+    def _reader(self):
+        """Per-thread read connection (sqlite3 connections are thread-bound)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    def query(self, uid=None, student_id=None, since=None, until=None, limit=1000, include_data=False):
+        """
+        Events matching all given filters, newest first.
+        since/until are Unix timestamps; each filter combination is served by an index.
+        """
+        where, params = [], []
+        if uid:
+            where.append("uid = ?")
+            params.append(uid)
+        if student_id:
+            where.append("student_id = ?")
+            params.append(str(student_id))
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("ts < ?")
+            params.append(until)
+
+        columns = COLUMNS + ("data",) if include_data else COLUMNS
+        sql = f"SELECT {', '.join(columns)} FROM scans"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        params.append(limit)
+
+        events = []
+        for row in self._reader().execute(sql, params):
+            event = dict(zip(columns, row))
+            event["verified"] = bool(event["verified"])
+            if include_data:
+                event["data"] = json.loads(event["data"])
+            events.append(event)
+        return events
+
+    def count(self):
+        return self._reader().execute("SELECT COUNT(*) FROM scans").fetchone()[0]
+
+    # --- analytics over the rollup tables ---
+
+    def _stream(self, sql, params):
+        """Rows from a private connection, so callers may iterate from any thread."""
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        try:
+            yield from conn.execute(sql, params)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _range(column, scale, since, until, gate, where=None, params=None):
+        where, params = list(where or []), list(params or [])
+        if since is not None:
+            where.append(f"{column} >= ?")
+            params.append(int(since // scale))
+        if until is not None:
+            where.append(f"{column} < ?")
+            params.append(-int(-until // scale))
+        if gate:
+            where.append("gate = ?")
+            params.append(gate)
+        return (" WHERE " + " AND ".join(where)) if where else "", params
+
+    def taps(self, since=None, until=None, gate=None, resolution="minute"):
+        """Taps, verified/failed counts and latency per gate per minute, hour or (local) day."""
+        if resolution == "day":
+            bucket = "date(minute * 60, 'unixepoch', 'localtime')"
+        else:
+            size = {"minute": 1, "hour": 60}[resolution]
+            bucket = f"(minute / {size}) * {size} * 60"
+        where, params = self._range("minute", 60, since, until, gate)
+        sql = (
+            f"SELECT {bucket} AS bucket, gate, SUM(taps), SUM(verified), SUM(latency_sum),"
+            f" SUM(latency_count), MAX(latency_max) FROM minute_buckets{where}"
+            " GROUP BY bucket, gate ORDER BY bucket, gate"
+        )
+        for bucket_value, gate_name, taps, verified, latency_sum, latency_count, latency_max in self._stream(sql, params):
+            yield {
+                "bucket": bucket_value if resolution == "day" else datetime.fromtimestamp(bucket_value).isoformat(),
+                "gate": gate_name,
+                "taps": taps,
+                "verified": verified,
+                "failed": taps - verified,
+                "mean_latency_ms": round(latency_sum / latency_count, 3) if latency_count else None,
+                "max_latency_ms": latency_max,
+            }
+
+    def latency_by_hour(self, since=None, until=None, gate=None):
+        """Per-hour tap count and latency percentiles (histogram bucket bounds), across gates unless filtered."""
+        where, params = self._range("hour", 3600, since, until, gate)
+        sql = f"SELECT hour, bucket, SUM(count) FROM hour_latency{where} GROUP BY hour, bucket ORDER BY hour"
+        current, counts = None, None
+        for hour, bucket, count in self._stream(sql, params):
+            if hour != current:
+                if current is not None:
+                    yield self._latency_row(current, counts)
+                current, counts = hour, [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            counts[bucket] += count
+        if current is not None:
+            yield self._latency_row(current, counts)
+
+    @staticmethod
+    def _latency_row(hour, counts):
+        return {
+            "hour": datetime.fromtimestamp(hour * 3600).isoformat(),
+            "taps": sum(counts),
+            "p50_ms": histogram_percentile(counts, 50),
+            "p95_ms": histogram_percentile(counts, 95),
+            "p99_ms": histogram_percentile(counts, 99),
+        }
+
+    def unique_students(self, since=None, until=None, gate=None):
+        """Distinct verified students per local day (since/until as Unix timestamps)."""
+        where, params = [], []
+        if since is not None:
+            where.append("day >= ?")
+            params.append(_local_day(since))
+        if until is not None:
+            where.append("day <= ?")
+            params.append(_local_day(until - 1))
+        clause, params = self._range("day", 1, None, None, gate, where, params)
+        sql = f"SELECT day, COUNT(DISTINCT student_id) FROM daily_students{clause} GROUP BY day ORDER BY day"
+        for day, count in self._stream(sql, params):
+            yield {"day": day, "unique_students": count}
@@ -2,20 +2,6 @@
 import json
 from datetime import datetime
 
-from pycardano import (
-    TransactionBuilder,
-    TransactionOutput,
-    Value,
-    Metadata,
-    AuxiliaryData,
-    AlonzoMetadata,
-    MultiAsset,
-    Asset,
-    AssetName,
-    Transaction,
-    TransactionWitnessSet,
-    VerificationKeyWitness,
-)
 from cardano import init_context, load_wallet, load_policy_key, check_connection
 from config import validate_config
 
@@ -106,6 +92,22 @@ def mint_student():
         }
     }
 
+    # Transaction building is the only part of this script that needs pycardano's tx types
+    from pycardano import (
+        TransactionBuilder,
+        TransactionOutput,
+        Value,
+        Metadata,
+        AuxiliaryData,
+        AlonzoMetadata,
+        MultiAsset,
+        Asset,
+        AssetName,
+        Transaction,
+        TransactionWitnessSet,
+        VerificationKeyWitness,
+    )
+
     auxiliary_data = AuxiliaryData(AlonzoMetadata(metadata=Metadata(metadata)))
     my_nft = MultiAsset()
     my_nft[policy_id] = Asset({AssetName(asset_name_bytes): 1})
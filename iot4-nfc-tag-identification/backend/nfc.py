@@ -1,25 +1,112 @@
 """
 NFC JSON Reader/Writer
-Functions to write and read JSON data to/from MiFare Classic NFC cards
+Functions to write and read JSON data to/from MiFare Classic and NTAG21x NFC cards.
+The card type is detected from SAK/ATQA: MIFARE Classic is read block by block
+with per-block auth, NTAG21x user pages are read with a single FAST_READ.
+MIFARE Classic cards can be secured with per-card keys from diversify_key
+(see card_keys.py for the UID -> key cache).
 """
 
+import hashlib
+import hmac
 import json
-import board
-import busio
-from digitalio import DigitalInOut
-from adafruit_pn532.adafruit_pn532 import MIFARE_CMD_AUTH_B
-from adafruit_pn532.spi import PN532_SPI
+import time
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from config import NFC_DRIVER, NFC_SIM_SCRIPT, NFC_SPI_BAUDRATE, NFC_POLL_INTERVAL, NFC_READY_DELAY
 
 
 # Default MiFare Classic authentication key
 DEFAULT_KEY = b"\xff\xff\xff\xff\xff\xff"
 
-# Initialize PN532 with SPI
-def init_pn532():
-    """Initialize and configure the PN532 NFC reader"""
+# PN532 MiFare authentication commands (key A / key B), same values as adafruit_pn532
+MIFARE_CMD_AUTH_A = 0x60
+MIFARE_CMD_AUTH_B = 0x61
+
+# Sector trailer access bits + GPB. Factory (transport) configuration: key B is
+# readable, so only key A may rewrite the trailer. Secured cards: data blocks
+# read/write with key A or B, trailer (keys and access bits) writable with key B only
+FACTORY_ACCESS = b"\xff\x07\x80\x69"
+SECURE_ACCESS = b"\x7f\x07\x88\x69"
+
+# Domain separator for per-card key diversification
+DIVERSIFY_PREFIX = b"nfc-student-key"
+
+# PN532 SPI status read request, and the status byte when a frame is ready
+PN532_SPI_STATREAD = 0x02
+PN532_SPI_READY = 0x01
+
+# PN532 commands used directly (adafruit_pn532 has no SAK/ATQA or FAST_READ API)
+PN532_CMD_INLISTPASSIVETARGET = 0x4A
+PN532_CMD_INDATAEXCHANGE = 0x40
+
+# NTAG21x commands, sent through InDataExchange
+NTAG_CMD_GET_VERSION = 0x60
+NTAG_CMD_FAST_READ = 0x3A
+
+# First user page, and pages read by the first FAST_READ: NTAG213's whole user
+# memory (144 bytes), which holds a typical student record in one exchange
+NTAG_USER_START = 4
+NTAG_FIRST_READ_PAGES = 36
+# Pages per FAST_READ that fit in one PN532 frame
+NTAG_MAX_READ_PAGES = 60
+# User pages by GET_VERSION storage size byte: NTAG213, NTAG215, NTAG216
+NTAG_USER_PAGES = {0x0F: 36, 0x11: 126, 0x13: 222}
+
+CARD_MIFARE_CLASSIC = "mifare_classic"
+CARD_NTAG = "ntag"
+CARD_UNKNOWN = "unknown"
+
+# A detected target: UID bytes, SAK, ATQA and the card type derived from them
+Card = namedtuple("Card", "uid sak atqa kind")
+
+# Block auth/read attempts and failures in read_json_from_nfc (exported as metrics)
+reader_stats = {"auth": 0, "auth_failed": 0, "read": 0, "read_failed": 0}
+
+
+def _open_pn532_spi(baudrate=NFC_SPI_BAUDRATE):
+    """PN532 on the Raspberry Pi SPI bus"""
+    import board
+    import busio
+    from digitalio import DigitalInOut
+    from adafruit_pn532.spi import PN532_SPI
+
     spi = busio.SPI(board.SCK, board.MOSI, board.MISO)
     cs_pin = DigitalInOut(board.D5)
     pn532 = PN532_SPI(spi, cs_pin, debug=False)
+    # SPIDevice applies its baudrate on every transaction
+    pn532._spi.baudrate = baudrate
+    return pn532
+
+
+def _open_simulator(baudrate=None):
+    """Simulated reader, scripted by NFC_SIM_SCRIPT or a single blank card"""
+    from nfc_simulator import SimulatedPN532, SimulatedCard
+
+    if NFC_SIM_SCRIPT:
+        return SimulatedPN532.from_file(NFC_SIM_SCRIPT)
+    reader = SimulatedPN532()
+    reader.place(SimulatedCard("04A2B3C4"))
+    return reader
+
+
+# Reader drivers: each returns an object with the PN532_SPI methods used below
+READER_DRIVERS = {
+    "pn532": _open_pn532_spi,
+    "sim": _open_simulator,
+}
+
+
+# Initialize PN532 with SPI
+def init_pn532(driver=None, spi_baudrate=None):
+    """
+    Initialize and configure the PN532 NFC reader (or the driver named by NFC_DRIVER).
+    spi_baudrate overrides NFC_SPI_BAUDRATE; the simulator ignores it.
+    """
+    driver = driver or NFC_DRIVER
+    if driver not in READER_DRIVERS:
+        raise ValueError(f"Unknown NFC driver: {driver}")
+    pn532 = READER_DRIVERS[driver](baudrate=spi_baudrate or NFC_SPI_BAUDRATE)
     
     # Get firmware version
     ic, ver, rev, support = pn532.firmware_version
@@ -31,16 +118,151 @@ def init_pn532():
     return pn532
 
 
-def wait_for_card(pn532, timeout=0.5):
-    """Wait for an NFC card to be present"""
+def card_kind(sak, atqa):
+    """Card type from SAK/ATQA (ISO 14443A): bit 3 of SAK marks MIFARE Classic 1K/4K/Mini."""
+    if sak & 0x08:
+        return CARD_MIFARE_CLASSIC
+    if sak == 0x00 and atqa == 0x0044:
+        return CARD_NTAG
+    return CARD_UNKNOWN
+
+
+def detect_card(pn532, timeout=0.5):
+    """One InListPassiveTarget poll; returns a Card (with SAK/ATQA) or None if no card."""
+    response = pn532.call_function(
+        PN532_CMD_INLISTPASSIVETARGET, params=[0x01, 0x00], response_length=19, timeout=timeout
+    )
+    # [targets, Tg, ATQA (2), SAK, UID length, UID...]
+    if not response or response[0] != 0x01 or response[5] > 7:
+        return None
+    sak = response[4]
+    atqa = (response[2] << 8) | response[3]
+    return Card(bytearray(response[6:6 + response[5]]), sak, atqa, card_kind(sak, atqa))
+
+
+def wait_for_target(pn532, timeout=0.5):
+    """Wait for an NFC card to be present; returns its Card"""
     print("Waiting for NFC card...")
     while True:
-        uid = pn532.read_passive_target(timeout=timeout)
+        card = detect_card(pn532, timeout=timeout)
         print(".", end="")
-        if uid is not None:
+        if card is not None:
             print("")
-            print("Found card with UID:", [hex(i) for i in uid])
-            return uid
+            print("Found card with UID:", [hex(i) for i in card.uid], f"({card.kind})")
+            return card
+
+
+def wait_for_card(pn532, timeout=0.5):
+    """Wait for an NFC card to be present"""
+    return wait_for_target(pn532, timeout=timeout).uid
+
+
+def ntag_fast_read(pn532, start_page, end_page):
+    """Pages start_page..end_page (inclusive) in one FAST_READ; None on error or NAK"""
+    length = 4 * (end_page - start_page + 1)
+    response = pn532.call_function(
+        PN532_CMD_INDATAEXCHANGE,
+        params=[0x01, NTAG_CMD_FAST_READ, start_page & 0xFF, end_page & 0xFF],
+        response_length=1 + length,
+    )
+    if not response or response[0] != 0x00 or len(response) < 1 + length:
+        return None
+    return response[1:1 + length]
+
+
+def ntag_user_pages(pn532):
+    """User memory size in pages from GET_VERSION (NTAG213 if the tag does not answer)"""
+    response = pn532.call_function(
+        PN532_CMD_INDATAEXCHANGE, params=[0x01, NTAG_CMD_GET_VERSION], response_length=9
+    )
+    if not response or response[0] != 0x00 or len(response) < 9:
+        return NTAG_USER_PAGES[0x0F]
+    return NTAG_USER_PAGES.get(response[7], NTAG_USER_PAGES[0x0F])
+
+
+def _read_ntag_bytes(pn532, max_pages=NTAG_USER_PAGES[0x13], debug=False, trace=None):
+    """User pages up to the zero terminator; the first FAST_READ covers NTAG213 entirely"""
+    data = bytearray()
+    page = NTAG_USER_START
+    count = NTAG_FIRST_READ_PAGES
+    while page < NTAG_USER_START + max_pages:
+        end_page = min(page + count, NTAG_USER_START + max_pages) - 1
+        if trace:
+            started = time.perf_counter()
+        chunk = ntag_fast_read(pn532, page, end_page)
+        if trace:
+            trace.add("fast_read", time.perf_counter() - started)
+        reader_stats["read"] += 1
+        if chunk is None:
+            reader_stats["read_failed"] += 1
+            if data:
+                break  # past the end of a smaller tag's memory
+            print(f"FAST_READ failed for pages {page}-{end_page}!")
+            return None
+        data.extend(chunk)
+        if debug:
+            print(f"Read pages {page}-{end_page}: {len(chunk)} bytes")
+        if 0 in chunk:
+            break
+        page = end_page + 1
+        count = NTAG_MAX_READ_PAGES
+    return data
+
+
+def _write_ntag_bytes(pn532, payload, debug=False):
+    """Write payload plus a zero terminator to consecutive user pages"""
+    user_pages = ntag_user_pages(pn532)
+    data = payload + bytes(4 - len(payload) % 4)  # at least one terminating zero
+    if len(data) > 4 * user_pages:
+        print(f"Data too large for tag: {len(payload)} bytes, {4 * user_pages - 1} available")
+        return False
+    for i in range(0, len(data), 4):
+        page = NTAG_USER_START + i // 4
+        if not pn532.ntag2xx_write_block(page, data[i:i + 4]):
+            print(f"Write failed for page {page}!")
+            return False
+        if debug:
+            print(f"Wrote page {page}: {data[i:i + 4].hex()}")
+    return True
+
+
+def _reverse_bits(byte):
+    # The PN532 talks LSB-first over SPI
+    return int(f"{byte:08b}"[::-1], 2)
+
+
+@contextmanager
+def fast_polling(pn532, interval=NFC_POLL_INTERVAL, ready_delay=NFC_READY_DELAY):
+    """
+    Poll the PN532 status byte every `interval` seconds instead of the driver's
+    10 ms, for back-to-back commands whose responses arrive within a few ms.
+    The first poll still waits `ready_delay` after chip select.
+    No-op for drivers without SPI status polling (the simulator).
+    """
+    if not hasattr(pn532, "_spi") or not hasattr(pn532, "_wait_ready"):
+        yield
+        return
+
+    status_cmd = bytearray([_reverse_bits(PN532_SPI_STATREAD), 0x00])
+    status = bytearray(2)
+
+    def wait_ready(timeout=1):
+        deadline = time.monotonic() + timeout
+        with pn532._spi as spi:
+            time.sleep(ready_delay)
+            while time.monotonic() < deadline:
+                spi.write_readinto(status_cmd, status)
+                if _reverse_bits(status[1]) == PN532_SPI_READY:
+                    return True
+                time.sleep(interval)
+        return False
+
+    pn532._wait_ready = wait_ready
+    try:
+        yield
+    finally:
+        # Back to the class method
+        del pn532._wait_ready
 
 
 def is_sector_trailer(block_num):
@@ -57,6 +279,72 @@ def get_next_data_block(block_num):
     return next_block
 
 
+def diversify_key(uid, master_key):
+    """Per-card 6-byte MIFARE key: HMAC-SHA256(master_key, prefix + UID), truncated."""
+    return hmac.new(master_key, DIVERSIFY_PREFIX + bytes(uid), hashlib.sha256).digest()[:6]
+
+
+def data_sectors(start_block=4, num_blocks=16):
+    """Sectors holding num_blocks data blocks from start_block (trailers skipped)."""
+    sectors = []
+    block_num = start_block
+    for i in range(num_blocks):
+        if is_sector_trailer(block_num):
+            block_num = get_next_data_block(block_num - 1)
+        if block_num // 4 not in sectors:
+            sectors.append(block_num // 4)
+        block_num = get_next_data_block(block_num)
+    return sectors
+
+
+def _rewrite_trailers(pn532, uid, sectors, current_key, new_key):
+    """Sectors whose trailer now holds new_key, in order; stops at the first failure."""
+    # Factory cards (factory key) take the trailer write under key A, secured ones under key B
+    auth = MIFARE_CMD_AUTH_A if current_key == DEFAULT_KEY else MIFARE_CMD_AUTH_B
+    access = FACTORY_ACCESS if new_key == DEFAULT_KEY else SECURE_ACCESS
+    trailer_data = bytearray(new_key + access + new_key)
+    changed = []
+    for sector in sectors:
+        trailer = sector * 4 + 3
+        if not pn532.mifare_classic_authenticate_block(uid, trailer, auth, current_key):
+            print(f"Authentication failed for sector {sector} trailer!")
+            break
+        if not pn532.mifare_classic_write_block(trailer, trailer_data):
+            print(f"Key write failed for sector {sector}!")
+            break
+        changed.append(sector)
+    return changed
+
+
+def set_sector_keys(pn532, uid, sectors, key, current_key=DEFAULT_KEY):
+    """
+    Replace keys A and B of each sector with `key` (SECURE_ACCESS, or the
+    factory access bits when `key` is the factory key). Authenticates each
+    trailer with current_key; the card must stay on the reader.
+    
+    If a sector fails, the sectors already changed are put back on current_key,
+    so a card is never left readable with neither key.
+    
+    Returns:
+        bool: True if every sector was updated, False otherwise
+    """
+    changed = _rewrite_trailers(pn532, uid, sectors, current_key, key)
+    if len(changed) == len(sectors):
+        return True
+    
+    # A rejected authentication halts the card; select it again before rolling back
+    restored = []
+    card = detect_card(pn532)
+    if changed and card is not None and card.uid == bytearray(uid):
+        restored = _rewrite_trailers(pn532, uid, changed, key, current_key)
+    stuck = [sector for sector in changed if sector not in restored]
+    if stuck:
+        print(f"✗ Sectors {stuck} now use the new key, the others the old one; retry on this card")
+    elif changed:
+        print(f"Sectors {changed} restored to the old key")
+    return False
+
+
 def format_nfc_card(pn532, start_block=4, num_blocks=16, key=DEFAULT_KEY):
     """
     Format/clear NFC card by writing zeros to data blocks
@@ -123,12 +411,15 @@ def write_json_to_nfc(pn532, json_data, start_block=4, key=DEFAULT_KEY, debug=Fa
         key: Authentication key (default: factory key)
         debug: Show detailed output (default: False)
     
+    NTAG21x tags ignore start_block and key; data starts at user page 4.
+    
     Returns:
         bool: True if successful, False otherwise
     """
     try:
         # Wait for card
-        uid = wait_for_card(pn532)
+        card = wait_for_target(pn532)
+        uid = card.uid
         
         # Convert JSON to string and then to bytes
         json_string = json.dumps(json_data, ensure_ascii=False)
@@ -138,6 +429,13 @@ def write_json_to_nfc(pn532, json_data, start_block=4, key=DEFAULT_KEY, debug=Fa
         if debug:
             print(f"Data length: {len(json_bytes)} bytes")
         
+        # NTAG21x: 4-byte user pages, no authentication
+        if card.kind == CARD_NTAG:
+            if not _write_ntag_bytes(pn532, json_bytes, debug=debug):
+                return False
+            print("✓ JSON data written successfully!")
+            return True
+        
         # Calculate number of blocks needed (16 bytes per block)
         num_blocks = (len(json_bytes) + 15) // 16
         if debug:
@@ -188,27 +486,16 @@ def write_json_to_nfc(pn532, json_data, start_block=4, key=DEFAULT_KEY, debug=Fa
         return False
 
 
-def read_json_from_nfc(pn532, start_block=4, num_blocks=4, key=DEFAULT_KEY, debug=False):
+def _read_mifare_bytes(pn532, uid, start_block, num_blocks, key, debug=False, trace=None, batched=True):
     """
-    Read JSON data from NFC card
-    
-    Args:
-        pn532: Initialized PN532 object
-        start_block: Starting block number (default: 4)
-        num_blocks: Number of blocks to read (default: 4, i.e., 64 bytes)
-        key: Authentication key (default: factory key)
-        debug: Show detailed output (default: False)
-    
-    Returns:
-        dict: Parsed JSON data, or None if failed
+    MIFARE Classic data blocks up to the first one containing the zero padding.
+    Batched: authenticate once per sector and issue the sector's reads back to
+    back with fast status polling; otherwise authenticate before every block.
     """
-    try:
-        # Wait for card
-        uid = wait_for_card(pn532)
-        
-        # Read data from blocks
-        all_data = bytearray()
-        
+    all_data = bytearray()
+    authenticated_sector = None
+    
+    with fast_polling(pn532) if batched else nullcontext():
         block_num = start_block
         for i in range(num_blocks):
             # Skip sector trailers
@@ -217,28 +504,108 @@ def read_json_from_nfc(pn532, start_block=4, num_blocks=4, key=DEFAULT_KEY, debu
                 if debug:
                     print(f"Skipping sector trailer, using block {block_num}")
             
-            # Authenticate block
-            if debug:
-                print(f"Authenticating block {block_num}...")
-            authenticated = pn532.mifare_classic_authenticate_block(
-                uid, block_num, MIFARE_CMD_AUTH_B, key
-            )
-            
-            if not authenticated:
-                print(f"Authentication failed for block {block_num}!")
-                return None
+            # Authenticate block (or its sector, once)
+            sector = block_num // 4
+            if not batched or sector != authenticated_sector:
+                if debug:
+                    print(f"Authenticating block {block_num}...")
+                if trace:
+                    started = time.perf_counter()
+                authenticated = pn532.mifare_classic_authenticate_block(
+                    uid, block_num, MIFARE_CMD_AUTH_B, key
+                )
+                if trace:
+                    trace.add("auth", time.perf_counter() - started)
+                
+                reader_stats["auth"] += 1
+                if not authenticated:
+                    reader_stats["auth_failed"] += 1
+                    print(f"Authentication failed for block {block_num}!")
+                    return None
+                authenticated_sector = sector
             
             # Read block
+            if trace:
+                started = time.perf_counter()
             block_data = pn532.mifare_classic_read_block(block_num)
+            if trace:
+                trace.add("read_block", time.perf_counter() - started)
+            reader_stats["read"] += 1
+            if block_data is None:
+                reader_stats["read_failed"] += 1
+                print(f"Read failed for block {block_num}!")
+                return None
             all_data.extend(block_data)
             if debug:
                 print(f"Read block {block_num}: {[hex(x) for x in block_data]}")
             
+            # JSON never contains NUL, so zero padding marks the end of the data
+            if 0 in block_data:
+                break
+            
             # Move to next block
             block_num = get_next_data_block(block_num)
+    
+    return all_data
+
+
+def read_json_from_nfc(pn532, start_block=4, num_blocks=4, key=DEFAULT_KEY, debug=False, trace=None, card=None,
+                       batched=True, fallback_keys=(), on_key=None):
+    """
+    Read JSON data from NFC card
+    
+    Args:
+        pn532: Initialized PN532 object
+        start_block: Starting block number (default: 4)
+        num_blocks: Maximum number of blocks to read (default: 4, i.e., 64 bytes).
+            Reading stops early at the first block containing the zero padding.
+        key: Authentication key (default: factory key)
+        debug: Show detailed output (default: False)
+        trace: Optional Trace collecting per-stage timings
+        card: Card already returned by detect_card (skips waiting for a card)
+        batched: MIFARE Classic: one auth per sector and fast status polling
+            (default: True); False authenticates every block with driver polling
+        fallback_keys: MIFARE Classic keys to retry with, in order, if `key` is
+            rejected (e.g. DEFAULT_KEY for cards not yet secured); the card is
+            selected again before each retry
+        on_key: MIFARE Classic: called with the key the card accepted
+    
+    NTAG21x tags are read with FAST_READ from user page 4; start_block,
+    num_blocks and key only apply to MIFARE Classic.
+    
+    Returns:
+        dict: Parsed JSON data, or None if failed
+    """
+    try:
+        # Wait for card
+        if card is None:
+            if trace:
+                started = time.perf_counter()
+            card = wait_for_target(pn532)
+            if trace:
+                trace.add("wait_for_card", time.perf_counter() - started)
+        
+        # Read data
+        if card.kind == CARD_NTAG:
+            all_data = _read_ntag_bytes(pn532, debug=debug, trace=trace)
+        else:
+            all_data = _read_mifare_bytes(pn532, card.uid, start_block, num_blocks, key, debug, trace, batched)
+            for fallback_key in fallback_keys:
+                if all_data is not None:
+                    break
+                # A rejected authentication halts the card; select it again
+                retry_card = detect_card(pn532)
+                if retry_card is None or retry_card.uid != card.uid:
+                    return None
+                key = fallback_key
+                all_data = _read_mifare_bytes(pn532, card.uid, start_block, num_blocks, key, debug, trace, batched)
+            if all_data is not None and on_key:
+                on_key(key)
+        if all_data is None:
+            return None
         
         # Convert bytes to string, removing null bytes
-        json_string = all_data.decode('utf-8', errors='ignore').rstrip('\x00')
+        json_string = all_data.split(b'\x00', 1)[0].decode('utf-8', errors='ignore')
         
         # Check if card is empty
         if not json_string or json_string.strip() == '':
@@ -246,7 +613,11 @@ def read_json_from_nfc(pn532, start_block=4, num_blocks=4, key=DEFAULT_KEY, debu
             return None
         
         # Parse JSON
+        if trace:
+            started = time.perf_counter()
         json_data = json.loads(json_string)
+        if trace:
+            trace.add("json_parse", time.perf_counter() - started)
         print(f"JSON data: {json_string}")
         
         return json_data
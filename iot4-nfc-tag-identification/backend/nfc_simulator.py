@@ -0,0 +1,333 @@
+"""
+Simulated PN532 reader with MIFARE Classic 1K and NTAG21x cards.
+Drop-in replacement for adafruit_pn532's PN532_SPI (the subset used by nfc.py,
+including raw InListPassiveTarget and InDataExchange via call_function),
+so the kiosk pipeline can be exercised and load-tested without hardware.
+
+Select it with NFC_DRIVER=sim; NFC_SIM_SCRIPT points to a JSON tap script
+(card "type" is "mifare" by default, or "ntag213", "ntag215", "ntag216"):
+
+    {
+      "cards": [{"uid": "04A2B3C4", "data": {"p": "...", "a": "...", "s": "2025001"}},
+                {"uid": "04112233445566", "type": "ntag215", "data": {"...": "..."}}],
+      "taps": [{"card": 0, "dwell": 0.5, "gap": 0.5}],
+      "loop": true,
+      "speed": 1.0,
+      "latency": {"detect": 0.03, "auth": 0.005, "read": 0.004, "write": 0.012, "fast_read": 0.008},
+      "failure_rate": {"detect": 0.0, "auth": 0.0, "read": 0.0, "write": 0.0}
+    }
+"""
+
+import json
+import time
+import random
+from collections import deque
+
+BLOCK_SIZE = 16
+BLOCKS_PER_SECTOR = 4
+SECTORS = 16
+DEFAULT_KEY = b"\xff\xff\xff\xff\xff\xff"
+# Factory access bits (transport configuration) + GPB
+DEFAULT_ACCESS = b"\xff\x07\x80\x69"
+# Secured trailer (nfc.SECURE_ACCESS): keys and access bits writable with key B only
+SECURE_ACCESS = b"\x7f\x07\x88\x69"
+
+MIFARE_CMD_AUTH_A = 0x60
+MIFARE_CMD_AUTH_B = 0x61
+
+PN532_CMD_INLISTPASSIVETARGET = 0x4A
+PN532_CMD_INDATAEXCHANGE = 0x40
+NTAG_CMD_READ = 0x30
+NTAG_CMD_GET_VERSION = 0x60
+NTAG_CMD_FAST_READ = 0x3A
+# InDataExchange status for a tag that did not answer / NAKed
+STATUS_TIMEOUT = 0x01
+
+# Typical PN532-over-SPI timings in seconds (fast_read: one FAST_READ of NTAG213's user memory)
+DEFAULT_LATENCY = {"detect": 0.03, "auth": 0.005, "read": 0.004, "write": 0.012, "fast_read": 0.008}
+
+# NTAG21x models: total pages, user pages and GET_VERSION storage size byte
+NTAG_MODELS = {"ntag213": (45, 36, 0x0F), "ntag215": (135, 126, 0x11), "ntag216": (231, 222, 0x13)}
+
+
+class SimulatedCard:
+    """MIFARE Classic 1K memory: 16 sectors x 4 blocks, per-sector keys A/B."""
+
+    sak = 0x08
+    atqa = 0x0004
+
+    def __init__(self, uid, key_a=DEFAULT_KEY, key_b=DEFAULT_KEY):
+        self.uid = bytes.fromhex(uid) if isinstance(uid, str) else bytes(uid)
+        self.blocks = [bytearray(BLOCK_SIZE) for _ in range(SECTORS * BLOCKS_PER_SECTOR)]
+        self.blocks[0][:len(self.uid)] = self.uid
+        for sector in range(SECTORS):
+            self.set_keys(sector, key_a, key_b)
+
+    def set_keys(self, sector, key_a, key_b):
+        trailer = sector * BLOCKS_PER_SECTOR + BLOCKS_PER_SECTOR - 1
+        self.blocks[trailer][:] = key_a + DEFAULT_ACCESS + key_b
+
+    def trailer_writer(self, block_num):
+        """Key type allowed to rewrite this sector's trailer: A in transport configuration, else B."""
+        trailer = self.blocks[(block_num // BLOCKS_PER_SECTOR) * BLOCKS_PER_SECTOR + BLOCKS_PER_SECTOR - 1]
+        return MIFARE_CMD_AUTH_B if bytes(trailer[6:10]) == SECURE_ACCESS else MIFARE_CMD_AUTH_A
+
+    def key(self, block_num, key_type):
+        trailer = self.blocks[(block_num // BLOCKS_PER_SECTOR) * BLOCKS_PER_SECTOR + BLOCKS_PER_SECTOR - 1]
+        return bytes(trailer[0:6]) if key_type == MIFARE_CMD_AUTH_A else bytes(trailer[10:16])
+
+    def load_json(self, data, start_block=4):
+        """Lay out JSON the same way nfc.write_json_to_nfc does."""
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        block_num = start_block
+        for i in range(0, len(payload), BLOCK_SIZE):
+            if (block_num + 1) % BLOCKS_PER_SECTOR == 0:
+                block_num += 1
+            chunk = payload[i:i + BLOCK_SIZE]
+            self.blocks[block_num][:] = chunk + bytes(BLOCK_SIZE - len(chunk))
+            block_num += 1
+
+
+class SimulatedNtag:
+    """NTAG21x memory: 4-byte pages, user data from page 4, no authentication."""
+
+    sak = 0x00
+    atqa = 0x0044
+
+    def __init__(self, uid, model="ntag213"):
+        self.uid = bytes.fromhex(uid) if isinstance(uid, str) else bytes(uid)
+        self.model = model
+        total, self.user_pages, self.storage = NTAG_MODELS[model]
+        self.pages = [bytearray(4) for _ in range(total)]
+        self.pages[0][:3] = self.uid[:3]
+        self.pages[1][:] = (self.uid[3:7] + bytes(4))[:4]
+        # Capability container: NDEF magic, version, data area size / 8
+        self.pages[3][:] = bytes([0xE1, 0x10, self.user_pages * 4 // 8, 0x00])
+
+    def version(self):
+        return bytes([0x00, 0x04, 0x04, 0x02, 0x01, 0x00, self.storage, 0x03])
+
+    def load_json(self, data, start_page=4):
+        """Lay out JSON the same way nfc.write_json_to_nfc does: JSON, then a zero byte."""
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        payload += bytes(4 - len(payload) % 4)
+        for i in range(0, len(payload), 4):
+            self.pages[start_page + i // 4][:] = payload[i:i + 4]
+
+
+def make_card(uid, card_type="mifare"):
+    """Card from a script entry's uid and "type"."""
+    if card_type in NTAG_MODELS:
+        return SimulatedNtag(uid, card_type)
+    return SimulatedCard(uid)
+
+
+class SimulatedPN532:
+    """PN532 stand-in: card field, per-command latency and failure injection."""
+
+    def __init__(self, cards=None, taps=None, loop=False, speed=1.0,
+                 latency=None, failure_rate=None, seed=None):
+        self.cards = list(cards or [])
+        self.script = list(taps or [])
+        self.loop = loop
+        self.speed = speed
+        self.latency = dict(DEFAULT_LATENCY, **(latency or {}))
+        self.failure_rate = failure_rate or {}
+        self.rng = random.Random(seed)
+        self.pending = deque(self.script)
+        self.field = None
+        self.arrived_at = 0.0
+        self.field_until = 0.0
+        self.gap_until = 0.0
+        self.gap = 0.0
+        self.authenticated = None
+        self.authenticated_with = None
+        self.stats = {"detect": 0, "auth": 0, "auth_failed": 0, "read": 0, "write": 0, "failed": 0}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            spec = json.load(f)
+        cards = []
+        for entry in spec.get("cards", []):
+            card = make_card(entry["uid"], entry.get("type", "mifare"))
+            if "data" in entry:
+                card.load_json(entry["data"])
+            cards.append(card)
+        taps = [(cards[t["card"]], t.get("dwell", 0.5), t.get("gap", 0.0)) for t in spec.get("taps", [])]
+        return cls(
+            cards=cards,
+            taps=taps,
+            loop=spec.get("loop", False),
+            speed=spec.get("speed", 1.0),
+            latency=spec.get("latency"),
+            failure_rate=spec.get("failure_rate"),
+            seed=spec.get("seed"),
+        )
+
+    # --- simulation control ---
+
+    def _wait(self, command):
+        delay = self.latency.get(command, 0.0) / self.speed
+        if delay > 0:
+            time.sleep(delay)
+
+    def _fails(self, command):
+        rate = self.failure_rate.get(command, 0.0)
+        if rate and self.rng.random() < rate:
+            self.stats["failed"] += 1
+            return True
+        return False
+
+    def place(self, card, dwell=None, arrived_at=None):
+        """Put a card on the reader, for `dwell` seconds (scaled by speed) or until removed."""
+        self.field = card
+        self.arrived_at = arrived_at if arrived_at is not None else time.monotonic()
+        self.field_until = self.arrived_at + dwell / self.speed if dwell is not None else float("inf")
+        self.authenticated = None
+
+    def remove(self):
+        self.field = None
+        self.authenticated = None
+
+    def _card(self):
+        """Card currently in the field (None once its dwell time has passed)."""
+        if self.field is not None and time.monotonic() < self.field_until:
+            return self.field
+        return None
+
+    def queue_tap(self, card, dwell=0.5, gap=0.0):
+        """Script a tap: card present for `dwell` s, then an empty field for `gap` s."""
+        self.pending.append((card, dwell, gap))
+
+    def _advance_script(self):
+        now = time.monotonic()
+        if self.field is not None:
+            if now < self.field_until:
+                return
+            self.remove()
+            self.gap_until = self.field_until + self.gap / self.speed
+        if not self.pending and self.loop:
+            self.pending.extend(self.script)
+        if not self.pending or now < self.gap_until:
+            return
+        # Taps follow the script's wall-clock schedule even if the reader polls late
+        card, dwell, self.gap = self.pending.popleft()
+        self.place(card, dwell, arrived_at=self.gap_until or now)
+
+    # --- PN532_SPI interface used by nfc.py ---
+
+    @property
+    def firmware_version(self):
+        return (0x32, 1, 6, 7)
+
+    def SAM_configuration(self):
+        pass
+
+    def _detect(self):
+        self._advance_script()
+        if self._card() is None:
+            return None
+        self._wait("detect")
+        self.stats["detect"] += 1
+        if self._fails("detect"):
+            return None
+        self.authenticated = None
+        return self.field
+
+    def read_passive_target(self, card_baud=0x00, timeout=1):
+        card = self._detect()
+        if card is None:
+            if self._card() is None:
+                time.sleep(min(timeout, self.latency["detect"]) / self.speed)
+            return None
+        return bytearray(card.uid)
+
+    def call_function(self, command, response_length=0, params=[], timeout=1):
+        """Raw PN532 commands: InListPassiveTarget and NTAG InDataExchange."""
+        if command == PN532_CMD_INLISTPASSIVETARGET:
+            card = self._detect()
+            if card is None:
+                if self._card() is None:
+                    time.sleep(min(timeout, self.latency["detect"]) / self.speed)
+                return None
+            return bytearray([0x01, 0x01, card.atqa >> 8, card.atqa & 0xFF, card.sak, len(card.uid)]) + card.uid
+        if command == PN532_CMD_INDATAEXCHANGE:
+            return bytearray(self._ntag_exchange(bytes(params[1:])))
+        raise NotImplementedError(f"Simulated PN532 does not support command 0x{command:02X}")
+
+    def _ntag_exchange(self, frame):
+        card = self._card()
+        if not isinstance(card, SimulatedNtag) or not frame:
+            return [STATUS_TIMEOUT]
+        if frame[0] == NTAG_CMD_GET_VERSION:
+            self._wait("read")
+            return [0x00] + list(card.version())
+        if frame[0] in (NTAG_CMD_READ, NTAG_CMD_FAST_READ):
+            start = frame[1]
+            end = frame[2] if frame[0] == NTAG_CMD_FAST_READ else start + 3
+            fast = frame[0] == NTAG_CMD_FAST_READ
+            self._wait("fast_read" if fast else "read")
+            self.stats["read"] += 1
+            if start > end or (fast and end >= len(card.pages)) or start >= len(card.pages) or self._fails("read"):
+                return [STATUS_TIMEOUT]
+            pages = [card.pages[page % len(card.pages)] for page in range(start, end + 1)]
+            return [0x00] + [b for page in pages for b in page]
+        return [STATUS_TIMEOUT]
+
+    def ntag2xx_write_block(self, block_number, data):
+        self._wait("write")
+        self.stats["write"] += 1
+        card = self._card()
+        if (
+            not isinstance(card, SimulatedNtag)
+            or len(data) != 4
+            or not 4 <= block_number < 4 + card.user_pages
+            or self._fails("write")
+        ):
+            return False
+        card.pages[block_number][:] = data
+        return True
+
+    def ntag2xx_read_block(self, block_number):
+        response = self._ntag_exchange(bytes([NTAG_CMD_READ, block_number]))
+        return bytearray(response[1:5]) if response[0] == 0x00 else None
+
+    def mifare_classic_authenticate_block(self, uid, block_number, key_number, key):
+        self._wait("auth")
+        self.stats["auth"] += 1
+        card = self._card()
+        if (
+            not isinstance(card, SimulatedCard)
+            or bytes(uid) != card.uid
+            or bytes(key) != card.key(block_number, key_number)
+            or self._fails("auth")
+        ):
+            self.stats["auth_failed"] += 1
+            self.authenticated = None
+            return False
+        self.authenticated = block_number // BLOCKS_PER_SECTOR
+        self.authenticated_with = key_number
+        return True
+
+    def _can_access(self, block_number):
+        return self._card() is not None and self.authenticated == block_number // BLOCKS_PER_SECTOR
+
+    def mifare_classic_read_block(self, block_number):
+        self._wait("read")
+        self.stats["read"] += 1
+        if not self._can_access(block_number) or self._fails("read"):
+            return None
+        return bytearray(self.field.blocks[block_number])
+
+    def mifare_classic_write_block(self, block_number, data):
+        self._wait("write")
+        self.stats["write"] += 1
+        if not self._can_access(block_number) or len(data) != BLOCK_SIZE or self._fails("write"):
+            return False
+        # Only access bits for trailers are modelled (data blocks take either key)
+        trailer = block_number % BLOCKS_PER_SECTOR == BLOCKS_PER_SECTOR - 1
+        if trailer and self.authenticated_with != self.field.trailer_writer(block_number):
+            return False
+        self.field.blocks[block_number][:] = data
+        return True
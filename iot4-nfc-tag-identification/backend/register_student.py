@@ -1,24 +1,13 @@
 #!/usr/bin/env python3
+import argparse
 import json
 from datetime import datetime
 
-from pycardano import (
-    TransactionBuilder,
-    TransactionOutput,
-    Value,
-    Metadata,
-    AuxiliaryData,
-    AlonzoMetadata,
-    MultiAsset,
-    Asset,
-    AssetName,
-    Transaction,
-    TransactionWitnessSet,
-    VerificationKeyWitness,
-)
 from cardano import init_context, load_wallet, load_policy_key, check_connection
-from nfc import init_pn532, write_json_to_nfc, read_json_from_nfc
+from nfc import init_pn532, write_json_to_nfc, set_sector_keys, data_sectors
+from card_keys import key_cache, read_card_json
 from config import validate_config
+from card_signature import sign_card
 
 
 def get_input(prompt, default=""):
@@ -49,6 +38,22 @@ def mint_nft(context, address, payment_skey, payment_vkey, policy_skey, policy_v
         }
     }
 
+    # Transaction building is the only part of this script that needs pycardano's tx types
+    from pycardano import (
+        TransactionBuilder,
+        TransactionOutput,
+        Value,
+        Metadata,
+        AuxiliaryData,
+        AlonzoMetadata,
+        MultiAsset,
+        Asset,
+        AssetName,
+        Transaction,
+        TransactionWitnessSet,
+        VerificationKeyWitness,
+    )
+
     auxiliary_data = AuxiliaryData(AlonzoMetadata(metadata=Metadata(metadata)))
     my_nft = MultiAsset()
     my_nft[policy_id] = Asset({AssetName(asset_name_bytes): 1})
@@ -80,12 +85,23 @@ def mint_nft(context, address, payment_skey, payment_vkey, policy_skey, policy_v
     }
 
 
-def write_to_nfc(pn532, policy_id, asset_name_hex, student_id):
+def write_to_nfc(pn532, policy_id, asset_name_hex, student_id, signature=None):
     nfc_data = {"p": policy_id, "a": asset_name_hex, "s": student_id}
+    if signature:
+        nfc_data["g"] = signature
     return write_json_to_nfc(pn532, nfc_data, debug=False)
 
 
-def register_student():
+def secure_card(pn532, uid):
+    """Switch the card's data sectors to its diversified key and cache the key for the kiosk."""
+    key = key_cache.derive(uid)
+    if not set_sector_keys(pn532, uid, data_sectors(num_blocks=16), key):
+        return None
+    key_cache.add(uid)
+    return key
+
+
+def register_student(sign=False):
     print("\n" + "=" * 50)
     print("  STUDENT NFC REGISTRATION")
     print("=" * 50)
@@ -132,8 +148,9 @@ def register_student():
     pn532 = init_pn532()
 
     print("\nPlace NFC card on reader to get UID...")
-    from nfc import wait_for_card
-    uid = wait_for_card(pn532)
+    from nfc import wait_for_target, CARD_MIFARE_CLASSIC
+    card = wait_for_target(pn532)
+    uid = card.uid
     nfc_uid = "".join(f"{b:02X}" for b in uid)
     print(f"NFC UID: {nfc_uid}")
 
@@ -156,13 +173,25 @@ def register_student():
     )
     print(f"✓ TX: {result['tx_id']}")
 
+    signature = None
+    if sign:
+        signature = sign_card(policy_skey, result["policy_id"], result["asset_name_hex"], student_id, nfc_uid)
+        print("✓ Card signed for offline verification")
+
     print("\n--- Writing to NFC ---")
     print("Keep card on reader...")
-    success = write_to_nfc(pn532, result["policy_id"], result["asset_name_hex"], student_id)
+    success = write_to_nfc(pn532, result["policy_id"], result["asset_name_hex"], student_id, signature)
+
+    # NTAG21x tags have no MIFARE keys
+    if success and key_cache.enabled and card.kind == CARD_MIFARE_CLASSIC:
+        print("\n--- Securing card ---")
+        success = secure_card(pn532, uid) is not None
+        if success:
+            print("✓ Card key diversified")
 
     if success:
         print("\n--- Verifying ---")
-        data = read_json_from_nfc(pn532, num_blocks=8, debug=False)
+        data = read_card_json(pn532, num_blocks=16, debug=False)
         if data:
             print("✓ NFC verified")
 
@@ -176,4 +205,8 @@ def register_student():
 
 
 if __name__ == "__main__":
-    register_student()
+    parser = argparse.ArgumentParser(description="Mint student NFT and write NFC card")
+    parser.add_argument("--sign", action="store_true", help="Write a policy-key signature for offline verification")
+    args = parser.parse_args()
+
+    register_student(sign=args.sign)
@@ -2,6 +2,7 @@
 """
 Run the FastAPI backend server.
 Usage: python run.py
+       API_WORKERS=4 python run.py   # one worker owns the NFC reader
 """
 
 import uvicorn
@@ -11,10 +12,13 @@ import os
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config import API_WORKERS
+
 if __name__ == "__main__":
     uvicorn.run(
         "backend.api.main:app",
         host="0.0.0.0",
         port=5000,
         reload=False,
+        workers=API_WORKERS,
     )
@@ -0,0 +1,53 @@
+"""
+In-process terminal renderer for the kiosk CLI.
+Draws a screen of text lines with ANSI escape sequences and, on each update,
+rewrites only the rows that changed, instead of clearing the terminal via a
+subprocess.
+"""
+
+import sys
+
+ESC = "\x1b["
+
+
+class TerminalDisplay:
+    """Line-diffing full-screen display on the terminal's alternate screen."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.lines = []
+        self.active = False
+
+    def start(self):
+        # Alternate screen, hidden cursor, cleared
+        self.stream.write(f"{ESC}?1049h{ESC}?25l{ESC}2J")
+        self.stream.flush()
+        self.lines = []
+        self.active = True
+
+    def close(self):
+        if self.active:
+            self.stream.write(f"{ESC}?25h{ESC}?1049l")
+            self.stream.flush()
+            self.active = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def render(self, lines):
+        """Redraw only rows whose text differs from the previous frame."""
+        out = []
+        for row, line in enumerate(lines):
+            if row >= len(self.lines) or self.lines[row] != line:
+                out.append(f"{ESC}{row + 1};1H{line}{ESC}K")
+        for row in range(len(lines), len(self.lines)):
+            out.append(f"{ESC}{row + 1};1H{ESC}K")
+        if out:
+            self.stream.write("".join(out))
+            self.stream.flush()
+        self.lines = list(lines)
+        return len(out)
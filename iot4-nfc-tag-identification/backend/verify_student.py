@@ -1,15 +1,14 @@
 #!/usr/bin/env python3
-import os
-import sys
+import io
 import time
+from collections import deque
+from contextlib import redirect_stdout
 from datetime import datetime
-from nfc import init_pn532, read_json_from_nfc
+from nfc import init_pn532, detect_card
+from card_keys import read_card_json
 from cardano import query_asset, check_connection
 from config import validate_config
-
-
-def clear_screen():
-    os.system('clear' if os.name != 'nt' else 'cls')
+from terminal_display import TerminalDisplay
 
 
 def verify_on_blockchain(policy_id, asset_name_hex, student_id):
@@ -33,45 +32,57 @@ def verify_on_blockchain(policy_id, asset_name_hex, student_id):
     }
 
 
-def display_result(result, last_scan_time):
-    clear_screen()
-    print("=" * 50)
-    print("  STUDENT VERIFICATION SYSTEM")
-    print("=" * 50)
-    print(f"  Last scan: {last_scan_time}")
-    print("=" * 50)
+def result_lines(result, last_scan_time, history=None, status=""):
+    """Screen contents for continuous mode; `history` adds a pane of recent taps."""
+    lines = [
+        "=" * 50,
+        "  STUDENT VERIFICATION SYSTEM",
+        "=" * 50,
+        f"  Last scan: {last_scan_time}",
+        "=" * 50,
+        "",
+    ]
 
     if result is None:
-        print("\n  Waiting for card...\n")
-        print("  Place student NFC card on reader")
+        lines += ["  Waiting for card...", "", "  Place student NFC card on reader"]
     elif result["verified"]:
-        print("\n  ✓ VERIFIED\n")
-        print(f"  ID:         {result['student_id']}")
-        print(f"  Name:       {result['student_name']}")
-        print(f"  Department: {result['department']}")
-        print(f"  Issued:     {result['issued_at']}")
+        lines += [
+            "  ✓ VERIFIED",
+            "",
+            f"  ID:         {result['student_id']}",
+            f"  Name:       {result['student_name']}",
+            f"  Department: {result['department']}",
+            f"  Issued:     {result['issued_at']}",
+        ]
     else:
-        print("\n  ✗ FAILED\n")
-        print(f"  Error: {result.get('error', 'Unknown')}")
+        lines += ["  ✗ FAILED", "", f"  Error: {result.get('error', 'Unknown')}"]
         if result.get('student_id'):
-            print(f"  Card ID: {result['student_id']}")
+            lines.append(f"  Card ID: {result['student_id']}")
 
-    print("\n" + "=" * 50)
-    print("  Press Ctrl+C to exit")
-    print("=" * 50)
+    if history is not None:
+        lines += ["", "-" * 50, f"  Recent taps ({len(history)})", "-" * 50]
+        for scan_time, entry in reversed(history):
+            if entry["verified"]:
+                lines.append(f"  {scan_time}  ✓ {entry['student_id']:<10} {entry['student_name']}"[:50])
+            else:
+                card = entry.get("student_id") or ""
+                lines.append(f"  {scan_time}  ✗ {card:<10} {entry.get('error', 'Unknown')}"[:50])
+
+    lines += ["", "=" * 50, f"  {status}" if status else "  Press Ctrl+C to exit", "=" * 50]
+    return lines
 
 
 def try_read_card(pn532):
-    uid = pn532.read_passive_target(timeout=0.5)
-    if uid is None:
+    card = detect_card(pn532, timeout=0.5)
+    if card is None:
         return None, None
 
-    uid_str = "".join(f"{b:02X}" for b in uid)
-    data = read_json_from_nfc(pn532, num_blocks=8, debug=False)
+    uid_str = "".join(f"{b:02X}" for b in card.uid)
+    data = read_card_json(pn532, card=card, num_blocks=16, debug=False)
     return uid_str, data
 
 
-def continuous_verify():
+def continuous_verify(history_size=0):
     errors = validate_config()
     if errors:
         print("Config errors:", errors)
@@ -86,35 +97,42 @@ def continuous_verify():
     last_result = None
     last_scan_time = "Never"
     last_uid = None
-
-    display_result(None, last_scan_time)
-
-    while True:
-        try:
-            uid_str, nfc_data = try_read_card(pn532)
-
-            if uid_str and uid_str != last_uid:
-                if nfc_data and all(f in nfc_data for f in ["p", "a", "s"]):
-                    last_result = verify_on_blockchain(
-                        nfc_data["p"], nfc_data["a"], nfc_data["s"]
-                    )
-                    last_scan_time = datetime.now().strftime("%H:%M:%S")
-                    last_uid = uid_str
-                    display_result(last_result, last_scan_time)
-                else:
-                    last_result = {"verified": False, "error": "Invalid card data"}
+    history = deque(maxlen=history_size) if history_size else None
+    status = ""
+
+    with TerminalDisplay() as display:
+        display.render(result_lines(None, last_scan_time, history))
+
+        while True:
+            try:
+                # nfc.py progress output would scroll the screen; keep it off the display
+                with redirect_stdout(io.StringIO()):
+                    uid_str, nfc_data = try_read_card(pn532)
+
+                if uid_str and uid_str != last_uid:
+                    if nfc_data and all(f in nfc_data for f in ["p", "a", "s"]):
+                        last_result = verify_on_blockchain(
+                            nfc_data["p"], nfc_data["a"], nfc_data["s"]
+                        )
+                    else:
+                        last_result = {"verified": False, "error": "Invalid card data"}
                     last_scan_time = datetime.now().strftime("%H:%M:%S")
                     last_uid = uid_str
-                    display_result(last_result, last_scan_time)
+                    if history is not None:
+                        history.append((last_scan_time, last_result))
+                    status = ""
+                    display.render(result_lines(last_result, last_scan_time, history))
+
+                time.sleep(0.3)
 
-            time.sleep(0.3)
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                status = f"Error: {e}"[:48]
+                display.render(result_lines(last_result, last_scan_time, history, status))
+                time.sleep(1)
 
-        except KeyboardInterrupt:
-            print("\n\nExiting...")
-            break
-        except Exception as e:
-            print(f"\nError: {e}")
-            time.sleep(1)
+    print("Exiting...")
 
 
 def verify_student():
@@ -130,7 +148,7 @@ def verify_student():
     pn532 = init_pn532()
 
     print("\nPlace student card on reader...")
-    data = read_json_from_nfc(pn532, num_blocks=8, debug=False)
+    data = read_card_json(pn532, num_blocks=16, debug=False)
 
     if not data:
         print("Could not read NFC tag")
@@ -164,9 +182,11 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Verify student via NFC + blockchain")
     parser.add_argument("-c", "--continuous", action="store_true", help="Daemon mode")
+    parser.add_argument("--history", type=int, default=0, metavar="N",
+                        help="Show the last N taps in continuous mode")
     args = parser.parse_args()
 
     if args.continuous:
-        continuous_verify()
+        continuous_verify(args.history)
     else:
         verify_student()
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 import argparse
 import json
-from nfc import init_pn532, write_json_to_nfc, read_json_from_nfc
+from nfc import init_pn532, write_json_to_nfc
+from card_keys import read_card_json
 
 
 def prepare_nfc_data(policy_id, asset_name_hex, student_id):
@@ -36,7 +37,7 @@ def write_student_tag(policy_id, asset_name_hex, student_id):
     if success:
         print("\n✓ Student data written to NFC tag successfully!")
         print("\nVerifying write...")
-        verify_data = read_json_from_nfc(pn532, num_blocks=8, debug=False)
+        verify_data = read_card_json(pn532, num_blocks=16, debug=False)
         if verify_data:
             print("✓ Verification successful!")
             print(f"Read back: {json.dumps(verify_data)}")
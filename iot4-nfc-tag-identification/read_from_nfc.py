@@ -2,7 +2,8 @@
 Read JSON data from NFC card
 """
 
-from nfc import init_pn532, read_json_from_nfc
+from nfc import init_pn532
+from card_keys import read_card_json
 
 if __name__ == "__main__":
     print("=== NFC JSON Reader ===\n")
@@ -14,7 +15,7 @@ if __name__ == "__main__":
     print("\nPlace your NFC card on the reader...\n")
     
     # Read JSON from NFC card (6 blocks to ensure we get all data, debug=False for clean output)
-    data = read_json_from_nfc(pn532, num_blocks=6, debug=False)
+    data = read_card_json(pn532, num_blocks=6, debug=False)
     
     if data:
         print("\n✓ Successfully read data from NFC card!")
@@ -3,7 +3,8 @@
 import { useState, useEffect, useCallback, useRef } from "react";
 
 export type ScanEvent = {
-  event: "scan" | "connected";
+  event: "scan" | "connected" | "status";
+  seq?: number;
   verified?: boolean;
   student_id?: string;
   student_name?: string;
@@ -14,6 +15,13 @@ export type ScanEvent = {
   timestamp: string;
 };
 
+// Frames from the server: single events, or a batch of missed events on reconnect
+type ServerMessage = Omit<ScanEvent, "event"> & {
+  event: ScanEvent["event"] | "replay";
+  epoch?: string;
+  events?: ScanEvent[];
+};
+
 export type ConnectionStatus = "connecting" | "connected" | "disconnected";
 
 type UseWebSocketScannerReturn = {
@@ -30,6 +38,9 @@ export function useWebSocketScanner(): UseWebSocketScannerReturn {
   const [lastScan, setLastScan] = useState<ScanEvent | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
+  // Last event seen, so a reconnect can replay what was missed
+  const lastSeqRef = useRef<number | null>(null);
+  const epochRef = useRef<string | null>(null);
 
   const connect = useCallback(() => {
     if (wsRef.current?.readyState === WebSocket.OPEN) return;
@@ -37,7 +48,11 @@ export function useWebSocketScanner(): UseWebSocketScannerReturn {
     setStatus("connecting");
 
     try {
-      const ws = new WebSocket(WS_URL);
+      const resumed = lastSeqRef.current !== null && epochRef.current !== null;
+      const url = resumed
+        ? `${WS_URL}?since=${lastSeqRef.current}&epoch=${epochRef.current}`
+        : WS_URL;
+      const ws = new WebSocket(url);
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -47,9 +62,29 @@ export function useWebSocketScanner(): UseWebSocketScannerReturn {
 
       ws.onmessage = (event) => {
         try {
-          const data: ScanEvent = JSON.parse(event.data);
-          if (data.event === "scan") {
-            setLastScan(data);
+          const data: ServerMessage = JSON.parse(event.data);
+          if (data.event === "connected" && data.epoch !== epochRef.current) {
+            // First connection or server restart: sequence numbers start over.
+            // A fresh connection is caught up to the hello's seq, so a reconnect
+            // before any event still asks for ?since=; after a restart the server
+            // replays the new run from the start.
+            epochRef.current = data.epoch ?? null;
+            lastSeqRef.current = resumed ? 0 : data.seq ?? null;
+          }
+          const events = data.event === "replay" ? data.events ?? [] : [data as ScanEvent];
+          for (const item of events) {
+            // "connected" carries the server's current seq, not an event of its own
+            if (item.seq !== undefined && item.event !== "connected") {
+              if (lastSeqRef.current !== null && item.seq <= lastSeqRef.current) continue;
+              lastSeqRef.current = item.seq;
+            }
+            if (item.event === "scan") {
+              setLastScan(item);
+            }
+          }
+          // A replay frame covers everything up to its own seq, even when empty
+          if (data.event === "replay" && data.seq !== undefined) {
+            lastSeqRef.current = Math.max(lastSeqRef.current ?? 0, data.seq);
           }
         } catch (err) {
           console.error("Failed to parse WebSocket message:", err);